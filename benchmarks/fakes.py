@@ -0,0 +1,337 @@
+"""Offline stand-ins for the Garmin, Strava, gspread and Notion clients.
+
+Every fake records each call in a shared ``CallRecorder`` and sleeps for a
+configurable latency, so benchmarks can count API calls per record and see how
+latency adds up without touching the network.
+"""
+import random
+import re
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Dict, List
+
+from health_tracker.utils.mapping_loader import (
+    TargetType, load_activity_mapping, load_health_mapping, load_rollup_mapping,
+)
+
+
+class CallRecorder:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+
+    def call(self, service: str, endpoint: str) -> None:
+        self.calls[(service, endpoint)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def total(self, service: str = None) -> int:
+        return sum(n for (s, _), n in self.calls.items() if service is None or s == service)
+
+    def by_service(self) -> Dict[str, int]:
+        totals: Counter = Counter()
+        for (service, _), n in self.calls.items():
+            totals[service] += n
+        return dict(totals)
+
+
+def _rng(key) -> random.Random:
+    return random.Random(str(key))
+
+
+def _dates(start: str, end: str) -> List[str]:
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+def _stats(cdate: str) -> dict:
+    rng = _rng(cdate)
+    return {
+        "averageStressLevel": rng.randint(15, 45),
+        "stressDuration": rng.randint(3600, 20000),
+        "weight": rng.randint(68000, 72000),
+        "bodyBatteryAtWakeTime": rng.randint(40, 100),
+        "totalSteps": rng.randint(3000, 20000),
+    }
+
+
+def _max_metrics(cdate: str) -> dict:
+    rng = _rng(cdate)
+    return {category: {"calendarDate": cdate, "vo2MaxValue": rng.randint(50, 60)} for category in ("generic", "cycling")}
+
+
+def _garmin_activity(cdate: str) -> dict:
+    """One list entry per day, shaped like Garmin's activitylist-service"""
+    rng = _rng(f"activity-{cdate}")
+    return {
+        "activityId": int(cdate.replace("-", "")),
+        "activityType": {"typeKey": rng.choice(["road_biking", "running", "virtual_ride"])},
+        "startTimeGMT": f"{cdate} 17:00:00",
+        "movingDuration": float(rng.randint(1800, 10800)),
+        "distance": rng.uniform(5000, 100000),
+        "averageSpeed": rng.uniform(2, 10),
+        "averageHR": float(rng.randint(110, 160)),
+        "maxHR": float(rng.randint(160, 190)),
+        "calories": float(rng.randint(300, 2000)),
+        "avgPower": float(rng.randint(150, 250)),
+        "maxPower": float(rng.randint(400, 900)),
+        "normPower": float(rng.randint(160, 260)),
+        "elevationGain": rng.uniform(0, 1500),
+    }
+
+
+def _wake_timestamp(cdate: str) -> int:
+    return int(datetime.fromisoformat(f"{cdate}T06:30:00+00:00").timestamp() * 1000)
+
+
+class FakeGarmin:
+    def __init__(self, recorder: CallRecorder):
+        self.recorder = recorder
+
+    def get_stats_and_body(self, cdate: str) -> dict:
+        self.recorder.call("garmin", "get_stats_and_body")
+        return _stats(cdate)
+
+    def get_sleep_data(self, cdate: str) -> dict:
+        self.recorder.call("garmin", "get_sleep_data")
+        rng = _rng(cdate)
+        return {
+            "dailySleepDTO": {
+                "sleepTimeSeconds": rng.randint(21000, 30000),
+                "sleepScores": {"overall": {"value": rng.randint(50, 95)}},
+                "deepSleepSeconds": rng.randint(3000, 7000),
+                "remSleepSeconds": rng.randint(3000, 7000),
+                "awakeSleepSeconds": rng.randint(300, 3000),
+                "awakeCount": rng.randint(0, 4),
+                "avgSleepStress": rng.uniform(10, 30),
+                "sleepNeed": {"actual": rng.randint(420, 540)},
+                "averageSpO2Value": rng.uniform(92, 99),
+                "sleepEndTimestampGMT": _wake_timestamp(cdate),
+            },
+            "avgOvernightHrv": rng.uniform(40, 80),
+            "restingHeartRate": rng.randint(42, 55),
+        }
+
+    def get_max_metrics(self, cdate: str) -> dict:
+        self.recorder.call("garmin", "get_max_metrics")
+        return _max_metrics(cdate)
+
+    def get_activities_by_date(self, startdate: str, enddate: str) -> List[dict]:
+        self.recorder.call("garmin", "get_activities_by_date")
+        return [
+            {"activityId": int(day.replace("-", "")), "activityType": {"typeKey": "road_cycling"},
+             "startTimeLocal": f"{day} 17:00:00"}
+            for day in _dates(startdate, enddate) if _rng(day).random() < 0.5
+        ]
+
+    def get_daily_steps(self, start: str, end: str) -> List[dict]:
+        self.recorder.call("garmin", "get_daily_steps")
+        return [{"calendarDate": day, "totalSteps": _stats(day)["totalSteps"]}
+                for day in _dates(start, end)]
+
+    def get_body_composition(self, startdate: str, enddate: str = None) -> dict:
+        self.recorder.call("garmin", "get_body_composition")
+        return {"dateWeightList": [{"calendarDate": day, "weight": _stats(day)["weight"]}
+                                   for day in _dates(startdate, enddate or startdate)]}
+
+    def get_body_battery(self, startdate: str, enddate: str = None) -> List[dict]:
+        self.recorder.call("garmin", "get_body_battery")
+        return [{"date": day, "bodyBatteryValuesArray": [[_wake_timestamp(day), _stats(day)["bodyBatteryAtWakeTime"]]]}
+                for day in _dates(startdate, enddate or startdate)]
+
+    def connectapi(self, path: str, params: dict = None, **kwargs):
+        self.recorder.call("garmin", "connectapi")
+        if path == "/activitylist-service/activities/search/activities":
+            # Newest first, paged like Garmin Connect
+            days = sorted(_dates(params["startDate"], params["endDate"]), reverse=True)
+            start, limit = int(params["start"]), int(params["limit"])
+            return [_garmin_activity(day) for day in days[start:start + limit]]
+        *_, kind, _, start, end = path.split("/")
+        if kind == "stress":
+            return [{"calendarDate": day, "values": {"overallStressLevel": _stats(day)["averageStressLevel"],
+                                                    "lowStressDuration": _stats(day)["stressDuration"]}}
+                    for day in _dates(start, end)]
+        if kind == "maxmet":
+            return [_max_metrics(day) for day in _dates(start, end)]
+        raise ValueError(f"Unexpected path {path}")
+
+    def get_activity(self, activity_id) -> dict:
+        self.recorder.call("garmin", "get_activity")
+        return {"summaryDTO": {"functionalThresholdPower": 250}}
+
+
+class FakeStrava:
+    PAGE_SIZE = 200
+
+    def __init__(self, recorder: CallRecorder, activity_count: int):
+        self.recorder = recorder
+        self.activity_count = activity_count
+
+    def get_activities(self, after: datetime, before: datetime):
+        span = (before - after) / max(self.activity_count, 1)
+        for i in range(self.activity_count):
+            if i % self.PAGE_SIZE == 0:
+                self.recorder.call("strava", "get_activities")
+            yield SimpleNamespace(id=1000 + i, start_date=after + span * i)
+
+    def get_activity(self, activity_id: int):
+        self.recorder.call("strava", "get_activity")
+        rng = _rng(activity_id)
+        return SimpleNamespace(
+            id=activity_id,
+            start_date=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=activity_id),
+            sport_type=SimpleNamespace(root=rng.choice(["Ride", "Run", "VirtualRide"])),
+            moving_time=rng.randint(1800, 10800),
+            distance=rng.uniform(5000, 100000),
+            average_speed=rng.uniform(2, 10),
+            average_heartrate=rng.uniform(110, 160),
+            max_heartrate=rng.uniform(160, 190),
+            calories=rng.randint(300, 2000),
+            average_watts=rng.uniform(150, 250),
+            max_watts=rng.uniform(400, 900),
+            weighted_average_watts=rng.uniform(160, 260),
+            total_elevation_gain=rng.uniform(0, 1500),
+        )
+
+    def get_activity_streams(self, activity_id: int, types=None, resolution=None, series_type=None):
+        self.recorder.call("strava", "get_activity_streams")
+        rng = _rng(activity_id)
+        length = rng.randint(1800, 3600)
+        data = {
+            "time": list(range(length)),
+            "heartrate": [rng.uniform(110, 170) for _ in range(length)],
+            "watts": [rng.uniform(100, 350) for _ in range(length)],
+            "velocity_smooth": [rng.uniform(5, 12) for _ in range(length)],
+        }
+        return {name: SimpleNamespace(data=values) for name, values in data.items() if not types or name in types}
+
+
+class FakeWorksheet:
+    CELL = re.compile(r"([A-Z]+)(\d+)$")
+
+    def __init__(self, spreadsheet: "FakeSpreadsheet", title: str):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.rows: Dict[int, Dict[str, object]] = {}
+
+    def col_values(self, col: int) -> list:
+        self.spreadsheet.recorder.call("sheets", "col_values")
+        letter = chr(ord("A") + col - 1)
+        last = max(self.rows, default=0)
+        values = [self.rows.get(r, {}).get(letter, "") for r in range(1, last + 1)]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def batch_get(self, ranges: list, major_dimension: str = "ROWS", value_render_option: str = None) -> list:
+        self.spreadsheet.recorder.call("sheets", "batch_get")
+        assert major_dimension == "COLUMNS"
+        last = max(self.rows, default=0)
+        result = []
+        for a1 in ranges:
+            letter = a1.split(":")[0]
+            values = [self.rows.get(r, {}).get(letter, "") for r in range(1, last + 1)]
+            while values and values[-1] == "":
+                values.pop()
+            result.append([values] if values else [])
+        return result
+
+    def get_all_values(self) -> list:
+        self.spreadsheet.recorder.call("sheets", "get_all_values")
+        return [list(self.rows.get(r, {}).values()) for r in range(1, max(self.rows, default=0) + 1)]
+
+    def update_cell(self, row: int, col: int, value) -> None:
+        self.spreadsheet.recorder.call("sheets", "update_cell")
+        self._set(row, chr(ord("A") + col - 1), value)
+
+    def _set(self, row: int, letter: str, value) -> None:
+        if isinstance(value, str) and value.startswith("'"):
+            value = value[1:]  # USER_ENTERED text marker
+        self.rows.setdefault(row, {})[letter] = value
+
+
+class FakeSpreadsheet:
+    def __init__(self, recorder: CallRecorder):
+        self.recorder = recorder
+        self.worksheets: Dict[str, FakeWorksheet] = {}
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self.recorder.call("sheets", "worksheet")
+        return self.worksheets.setdefault(title, FakeWorksheet(self, title))
+
+    def values_batch_update(self, body: dict) -> None:
+        self.recorder.call("sheets", "values_batch_update")
+        for update in body["data"]:
+            sheet, _, cell = update["range"].lstrip("$").rpartition("!")
+            match = FakeWorksheet.CELL.match(cell)
+            ws = self.worksheets.setdefault(sheet, FakeWorksheet(self, sheet))
+            ws._set(int(match.group(2)), match.group(1), update["values"][0][0])
+
+
+class FakeGspreadClient:
+    def __init__(self, recorder: CallRecorder):
+        self.recorder = recorder
+        self.spreadsheet = FakeSpreadsheet(recorder)
+
+    def open_by_url(self, url: str) -> FakeSpreadsheet:
+        self.recorder.call("sheets", "open_by_url")
+        return self.spreadsheet
+
+
+class FakeNotionError(Exception):
+    """Shaped like notion_client's APIResponseError"""
+
+    def __init__(self, code: str, status: int):
+        super().__init__(code)
+        self.code = code
+        self.status = status
+
+
+class _FakeNotionDatabases:
+    def __init__(self, client: "FakeNotionClient"):
+        self.client = client
+
+    def query(self, database_id: str, filter: dict = None, **kwargs) -> dict:
+        self.client.recorder.call("notion", "databases.query")
+        title = (filter or {}).get("title", {}).get("equals")
+        pages = self.client.pages_by_title.get(database_id, {})
+        return {"results": [{"id": pages[title]}] if title in pages else []}
+
+    def retrieve(self, database_id: str) -> dict:
+        """A schema matching the shipped Notion mappings"""
+        self.client.recorder.call("notion", "databases.retrieve")
+        mappings = (load_health_mapping(TargetType.NOTION), load_activity_mapping(TargetType.NOTION),
+                    load_rollup_mapping(TargetType.NOTION))
+        properties = {cfg["name"]: {"type": cfg["type"]} for mapping in mappings for cfg in mapping.values()}
+        return {"id": database_id, "properties": properties}
+
+
+class _FakeNotionPages:
+    def __init__(self, client: "FakeNotionClient"):
+        self.client = client
+
+    def create(self, parent: dict, properties: dict) -> dict:
+        self.client.recorder.call("notion", "pages.create")
+        title = properties["Title"]["title"][0]["text"]["content"]
+        page_id = f"page-{len(self.client.store)}"
+        self.client.store[page_id] = dict(properties)
+        self.client.pages_by_title.setdefault(parent["database_id"], {})[title] = page_id
+        return {"id": page_id}
+
+    def update(self, page_id: str, properties: dict) -> dict:
+        self.client.recorder.call("notion", "pages.update")
+        if page_id not in self.client.store:
+            raise FakeNotionError("object_not_found", 404)
+        self.client.store[page_id].update(properties)
+        return {"id": page_id}
+
+
+class FakeNotionClient:
+    def __init__(self, recorder: CallRecorder):
+        self.recorder = recorder
+        self.store: Dict[str, dict] = {}
+        self.pages_by_title: Dict[str, Dict[str, str]] = {}
+        self.databases = _FakeNotionDatabases(self)
+        self.pages = _FakeNotionPages(self)
@@ -0,0 +1,78 @@
+"""Compare the memory footprint of 10k-record batches.
+
+Usage: python -m benchmarks.record_memory [--records 10000]
+
+"dataclass" is the previous plain ``@dataclass`` layout, "slotted" the current
+record types and "batch" a columnar ``RecordBatch`` holding the same records.
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from datetime import datetime, timedelta
+
+from health_tracker.data.activity_data import ActivityData
+from health_tracker.data.day_health_data import DayHealthData
+from health_tracker.data.record import numeric_fields
+from health_tracker.data.record_batch import RecordBatch
+
+
+def sample_values(record_cls, i: int) -> dict:
+    numeric = numeric_fields(record_cls)
+    values = {}
+    for f in fields(record_cls):
+        if f.name in numeric:
+            values[f.name] = round(random.uniform(0, 300), 2) if random.random() > 0.1 else None
+        elif f.name == "date":
+            values[f.name] = datetime(2020, 1, 1) + timedelta(days=i)
+        else:
+            values[f.name] = f"{f.name}-{i}"
+    return values
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def run(record_cls, count: int) -> dict:
+    legacy_cls = make_dataclass(f"Legacy{record_cls.__name__}", [(f.name, f.type, f) for f in fields(record_cls)])
+    rows = [sample_values(record_cls, i) for i in range(count)]
+
+    def batch():
+        records = [record_cls(**row) for row in rows]
+        result = RecordBatch.from_records(record_cls, records)
+        del records
+        return result
+
+    return {
+        "dataclass": measure(lambda: [legacy_cls(**row) for row in rows]),
+        "slotted": measure(lambda: [record_cls(**row) for row in rows]),
+        "batch": measure(batch),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10_000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'record type':<16}{'layout':<12}{'bytes':>14}{'vs dataclass':>14}")
+    for record_cls in (DayHealthData, ActivityData):
+        results = run(record_cls, args.records)
+        baseline = results["dataclass"]
+        for layout, size in results.items():
+            print(f"{record_cls.__name__:<16}{layout:<12}{size:>14,}{size / baseline:>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""End-to-end sync benchmark against offline fake clients.
+
+Usage:
+    python -m benchmarks.sync_benchmark [--sizes 1,30,365,1000] [--latency-ms 1]
+                                        [--targets sheets,notion] [--json out.json]
+                                        [--save-baseline benchmarks/baseline.json]
+                                        [--compare benchmarks/baseline.json --tolerance 0.25]
+
+Each scenario drives SyncService.sync_health or SyncService.sync_activities
+with fake Garmin/Strava/gspread/Notion clients and reports wall time, API calls
+per record and peak traced memory. With --compare the run exits non-zero when
+calls per record went up, or wall time / peak memory grew beyond the tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.fakes import CallRecorder, FakeGarmin, FakeGspreadClient, FakeNotionClient, FakeStrava
+from health_tracker.analytics.training_metrics import TrainingMetrics
+from health_tracker.destination.destination import Target, TargetType
+from health_tracker.destination.google_sheets import GoogleSheets
+from health_tracker.destination.notion import Notion
+from health_tracker.provider.activities.garmin import GarminActivitiesProvider
+from health_tracker.provider.activities.strava import StravaActivitiesProvider
+from health_tracker.provider.health.garmin import GarminHealthProvider
+from health_tracker.sync_service import SyncService
+from health_tracker.utils.rate_limit import get_rate_limiter
+
+DEFAULT_SIZES = [1, 30, 365, 1000]
+START = date(2022, 1, 1)
+
+
+class BenchHealthSource:
+    label = "garmin"
+
+    def __init__(self, recorder: CallRecorder):
+        self.provider = GarminHealthProvider(garmin=FakeGarmin(recorder))
+
+
+class BenchActivitiesSource:
+    label = "strava"
+
+    def __init__(self, recorder: CallRecorder, count: int, workdir: Path):
+        self.recorder = recorder
+        self.count = count
+        self.workdir = workdir
+
+    def provider(self, target: Target = None) -> StravaActivitiesProvider:
+        provider = StravaActivitiesProvider(target, client=FakeStrava(self.recorder, self.count))
+        provider.PROCESSED_FILE = self.workdir / "processed_activities.json"
+        return provider
+
+
+class BenchGarminActivitiesSource:
+    """One activity per day from the fake Garmin activity list"""
+    label = "garmin"
+
+    def __init__(self, recorder: CallRecorder, workdir: Path):
+        self.recorder = recorder
+        self.workdir = workdir
+
+    def provider(self, target: Target = None) -> GarminActivitiesProvider:
+        provider = GarminActivitiesProvider(target, garmin=FakeGarmin(self.recorder))
+        provider.PROCESSED_FILE = self.workdir / "garmin_processed_activities.json"
+        return provider
+
+
+def make_target(target_type: TargetType, recorder: CallRecorder, workdir: Path) -> Target:
+    target = Target(target_type)
+    if target_type == TargetType.SHEETS:
+        target.instance = GoogleSheets(client=FakeGspreadClient(recorder))
+    else:
+        target.instance = Notion(client=FakeNotionClient(recorder), page_index_file=workdir / "notion_page_index.json",
+                                 schema_cache_file=workdir / "notion_schema_cache.json")
+    return target
+
+
+def run_scenario(kind: str, target_type: TargetType, size: int, latency: float, trace_memory: bool) -> dict:
+    recorder = CallRecorder(latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        target = make_target(target_type, recorder, workdir)
+        service = SyncService()
+        service.ledger_file = workdir / "sync_ledger.json"
+        service.retry_queue_file = workdir / "retry_queue.json"
+        service.lock_dir = workdir / "locks"
+        if service.metrics:
+            service.metrics = TrainingMetrics(history_file=workdir / "analytics_history.json")
+
+        if kind == "health":
+            source = BenchHealthSource(recorder)
+            end = START + timedelta(days=size - 1)
+            sync = lambda: service.sync_health(source, target, START.isoformat(), end.isoformat())
+        else:
+            if kind == "garmin-activities":
+                source = BenchGarminActivitiesSource(recorder, workdir)
+            else:
+                source = BenchActivitiesSource(recorder, size, workdir)
+            end = datetime.combine(START, datetime.min.time()) + timedelta(days=size)
+            sync = lambda: service.sync_activities(
+                source, target, f"{START.isoformat()} 00:00:00", end.strftime("%Y-%m-%d %H:%M:%S")
+            )
+
+        recorder.calls.clear()
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            sync()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+    return {
+        "wall_time": elapsed,
+        "calls": recorder.total(),
+        "calls_per_record": recorder.total() / size,
+        "calls_by_service": recorder.by_service(),
+        "peak_memory": peak,
+    }
+
+
+def run(sizes: List[int], targets: List[TargetType], latency: float) -> Dict[str, dict]:
+    results = {}
+    for kind in ("health", "activities", "garmin-activities"):
+        for target_type in targets:
+            for size in sizes:
+                name = f"{kind}/{target_type.value}/{size}"
+                timed = run_scenario(kind, target_type, size, latency, trace_memory=False)
+                traced = run_scenario(kind, target_type, size, latency, trace_memory=True)
+                timed["peak_memory"] = traced["peak_memory"]
+                results[name] = timed
+                print(f"{name:<28}{timed['wall_time']:>9.3f}s{timed['calls_per_record']:>9.2f} calls/rec"
+                      f"{timed['peak_memory'] / 1024:>12,.0f} KiB  {timed['calls_by_service']}")
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["calls_per_record"] > previous["calls_per_record"] + 1e-9:
+            regressions.append(f"{name}: calls/record {previous['calls_per_record']:.2f} → {current['calls_per_record']:.2f}")
+        for metric in ("wall_time", "peak_memory"):
+            if previous.get(metric) and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {previous[metric]:.3f} → {current[metric]:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end sync benchmark")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--targets", default=",".join(t.value for t in TargetType))
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Injected latency per fake API call")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON")
+    parser.add_argument("--save-baseline", help="Store results as the baseline file")
+    parser.add_argument("--compare", help="Baseline file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative growth of time and memory")
+    args = parser.parse_args()
+
+    os.environ.setdefault("NOTION_HEALTH_DATABASE_ID", "bench-health")
+    os.environ.setdefault("NOTION_ACTIVITIES_DATABASE_ID", "bench-activities")
+    # Injected latency stands in for the real services; quotas would only measure sleeping
+    for service in ("garmin", "strava", "sheets", "notion"):
+        get_rate_limiter().set_limits(service, [])
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    targets = [TargetType(t) for t in args.targets.split(",")]
+    results = run(sizes, targets, args.latency_ms / 1000)
+
+    for path in filter(None, (args.json_path, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
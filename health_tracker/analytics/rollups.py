@@ -0,0 +1,228 @@
+import threading
+from datetime import date, datetime, timedelta
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import pandas as pd
+
+from health_tracker.data.activity_data import ActivityData
+from health_tracker.data.day_health_data import DayHealthData
+from health_tracker.data.rollup_data import RollupData
+from health_tracker.utils.config_loader import config_get, config_get_path
+from health_tracker.utils.state_file import load_json, locked, update_json, write_json
+
+PERIODS = ("week", "month")
+ALL_SPORTS = "All"
+
+
+def _locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class Rollups:
+    """Weekly and monthly summaries per target: distance and time per sport, average sleep, HRV and resting HR.
+
+    The daily inputs and activity totals each target received are kept in a
+    local file. Recording data marks its week and month as pending, and only
+    pending periods are recomputed and written until the target accepts them.
+    Concurrent runs share the file: each merges what it recorded into the file
+    on save instead of writing back the copy it loaded.
+    """
+
+    def __init__(self, rollups_file: Optional[Path] = None):
+        self.rollups_file = rollups_file or config_get_path('rollups.file', 'rollups.json')
+        self.periods = list(config_get('rollups.periods') or PERIODS)
+        unknown = set(self.periods) - set(PERIODS)
+        if unknown:
+            raise ValueError(f"Unknown rollup periods {sorted(unknown)}, expected some of {', '.join(PERIODS)}")
+        self._data = load_json(self.rollups_file)
+        # Keys recorded since the file was last merged, per target and section
+        self._touched: Dict[str, Dict[str, Set[str]]] = {}
+        self._changed = False
+        self._lock = threading.RLock()
+
+    def health_inputs(self) -> Set[str]:
+        """DayHealthData fields record_health reads"""
+        return {"sleep_hours", "average_overnight_hrv", "resting_heart_rate"}
+
+    def activity_inputs(self) -> Set[str]:
+        """ActivityData fields record_activities reads"""
+        return {"distance", "duration_seconds"}
+
+    @_locked
+    def record_health(self, target_label: str, days: Iterable[DayHealthData]) -> None:
+        state, touched = self._state(target_label), self._touched_keys(target_label)
+        for data in days:
+            day = self._day_key(data.date)
+            state["days"][day] = {
+                "sleep": data.sleep_hours,
+                "hrv": data.average_overnight_hrv,
+                "rhr": data.resting_heart_rate,
+            }
+            touched["days"].add(day)
+            self._touch(target_label, day)
+
+    @_locked
+    def record_activities(self, target_label: str, activities: Iterable[ActivityData]) -> None:
+        state, touched = self._state(target_label), self._touched_keys(target_label)
+        for activity in activities:
+            day = self._day_key(activity.date)
+            previous = state["activities"].get(str(activity.id))
+            if previous and previous["date"] != day:
+                self._touch(target_label, previous["date"])
+            state["activities"][str(activity.id)] = {
+                "date": day,
+                "sport": activity.sport_type,
+                "distance": activity.distance,
+                "duration": activity.duration_seconds,
+            }
+            touched["activities"].add(str(activity.id))
+            self._touch(target_label, day)
+
+    @_locked
+    def pending(self, target_label: str) -> Tuple[List[RollupData], Dict[str, int]]:
+        """Rows of every pending period, plus the snapshot to pass to ``written`` once they are stored"""
+        state = self._state(target_label)
+        snapshot = dict(state["pending"])
+        if not snapshot:
+            return [], snapshot
+
+        days = pd.DataFrame.from_dict(state["days"], orient="index", columns=["sleep", "hrv", "rhr"]).astype("float64")
+        activities = pd.DataFrame.from_dict(state["activities"], orient="index",
+                                            columns=["date", "sport", "distance", "duration"])
+        activities[["distance", "duration"]] = activities[["distance", "duration"]].astype("float64")
+
+        rows: List[RollupData] = []
+        for period_key in sorted(snapshot):
+            rows.extend(self._summarize(period_key, days, activities))
+        return rows, snapshot
+
+    @_locked
+    def written(self, target_label: str, snapshot: Dict[str, int]) -> None:
+        """Clear the periods of ``snapshot`` unless they were touched again since"""
+        pending = self._state(target_label)["pending"]
+        for period_key, version in snapshot.items():
+            if pending.get(period_key) == version:
+                del pending[period_key]
+                self._changed = True
+
+    @_locked
+    def write(self, target_label: str, update: Callable[[List[RollupData]], None]) -> int:
+        """Pass the pending rows to ``update``, mark them written once it returns and return their count.
+
+        Holds the rollups file lock throughout, so flows sharing a target (the
+        threads of sync_all or separate sync processes) write one after the
+        other, each from the inputs all of them recorded.
+        """
+        with locked(self.rollups_file):
+            self._merge_into(load_json(self.rollups_file))
+            try:
+                rows, snapshot = self.pending(target_label)
+                if rows:
+                    update(rows)
+                    self.written(target_label, snapshot)
+            finally:
+                write_json(self.rollups_file, self._data)
+                self._changed = False
+        return len(rows)
+
+    @_locked
+    def save(self) -> None:
+        if not self._changed:
+            return
+        update_json(self.rollups_file, self._merge_into)
+        self._changed = False
+
+    def _merge_into(self, data: dict) -> None:
+        """Apply what was recorded here to ``data`` (the file's current contents) and adopt the result"""
+        for target_label, touched in self._touched.items():
+            ours = self._state(target_label)
+            theirs = data.setdefault(target_label, {})
+            for section in ("days", "activities", "pending"):
+                theirs.setdefault(section, {})
+            for section in ("days", "activities"):
+                for key in touched[section]:
+                    theirs[section][key] = ours[section][key]
+            for period_key in touched["pending"]:
+                theirs["pending"][period_key] = theirs["pending"].get(period_key, 0) + 1
+        self._data = data
+        self._touched = {}
+
+    def _summarize(self, period_key: str, days: pd.DataFrame, activities: pd.DataFrame) -> List[RollupData]:
+        period, start = period_key.split(":")
+        end, label = self._period_end(period, start), self._label(period, start)
+        period_days = days[(days.index >= start) & (days.index <= end)]
+        period_activities = activities[(activities["date"] >= start) & (activities["date"] <= end)]
+
+        def row(sport_type: str, group: pd.DataFrame, **health) -> RollupData:
+            return RollupData(
+                key=f"{label} {sport_type}", period=period, label=label, period_start=start, period_end=end,
+                sport_type=sport_type, activity_count=len(group),
+                distance_km=round(float(group["distance"].sum()) / 1000, 2),
+                duration_hours=round(float(group["duration"].sum()) / 3600, 2),
+                **health,
+            )
+
+        rows = [row(
+            ALL_SPORTS, period_activities,
+            average_sleep_hours=self._mean(period_days["sleep"]),
+            average_overnight_hrv=self._mean(period_days["hrv"]),
+            average_resting_heart_rate=self._mean(period_days["rhr"]),
+        )]
+        for sport_type, group in period_activities.groupby("sport", sort=True):
+            rows.append(row(str(sport_type), group))
+        return rows
+
+    def _touch(self, target_label: str, day: str) -> None:
+        pending = self._state(target_label)["pending"]
+        for period in self.periods:
+            period_key = f"{period}:{self._period_start(period, day)}"
+            pending[period_key] = pending.get(period_key, 0) + 1
+            self._touched_keys(target_label)["pending"].add(period_key)
+        self._changed = True
+
+    def _touched_keys(self, target_label: str) -> Dict[str, Set[str]]:
+        return self._touched.setdefault(target_label, {"days": set(), "activities": set(), "pending": set()})
+
+    def _state(self, target_label: str) -> dict:
+        state = self._data.setdefault(target_label, {})
+        for section in ("days", "activities", "pending"):
+            state.setdefault(section, {})
+        return state
+
+    @staticmethod
+    def _period_start(period: str, day: str) -> str:
+        current = date.fromisoformat(day)
+        if period == "week":
+            return (current - timedelta(days=current.weekday())).isoformat()
+        return current.replace(day=1).isoformat()
+
+    @staticmethod
+    def _period_end(period: str, start: str) -> str:
+        first = date.fromisoformat(start)
+        if period == "week":
+            return (first + timedelta(days=6)).isoformat()
+        next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return (next_month - timedelta(days=1)).isoformat()
+
+    @staticmethod
+    def _label(period: str, start: str) -> str:
+        if period == "week":
+            year, week, _ = date.fromisoformat(start).isocalendar()
+            return f"{year}-W{week:02d}"
+        return start[:7]
+
+    @staticmethod
+    def _mean(values: pd.Series) -> Optional[float]:
+        return round(float(values.mean()), 2) if values.notna().any() else None
+
+    @staticmethod
+    def _day_key(value: Union[datetime, date, str]) -> str:
+        if isinstance(value, (datetime, date)):
+            return value.strftime("%Y-%m-%d")
+        return str(value)[:10]
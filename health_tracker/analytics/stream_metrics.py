@@ -0,0 +1,133 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from health_tracker.utils.config_loader import config_get, config_get_float
+
+# Samples further apart than this are treated as a pause, not as time spent riding
+MAX_GAP_SECONDS = 5
+BEST_POWER_WINDOWS = {"best_power_5s": 5, "best_power_1m": 60, "best_power_5m": 300, "best_power_20m": 1200}
+HR_ZONE_MAX_HR_PCT = [0.6, 0.7, 0.8, 0.9]
+POWER_ZONE_FTP_PCT = [0.55, 0.75, 0.9, 1.05, 1.2, 1.5]
+
+HR_ZONE_FIELDS = [f"hr_zone_{i}_seconds" for i in range(1, len(HR_ZONE_MAX_HR_PCT) + 2)]
+POWER_ZONE_FIELDS = [f"power_zone_{i}_seconds" for i in range(1, len(POWER_ZONE_FTP_PCT) + 2)]
+STREAM_FIELDS = HR_ZONE_FIELDS + POWER_ZONE_FIELDS + list(BEST_POWER_WINDOWS) + ["aerobic_decoupling"]
+
+
+class StreamMetrics:
+    """Time in HR/power zones, best average power and aerobic decoupling from activity streams.
+
+    Zone bounds are upper limits of every zone but the last: ``analytics.hr_zones``
+    in bpm (or derived from ``analytics.max_hr``) and power zones as Coggan
+    percentages of ``analytics.ftp``.
+    """
+
+    def __init__(self, ftp: Optional[float] = None, max_hr: Optional[float] = None):
+        ftp = ftp or config_get_float('analytics.ftp')
+        max_hr = max_hr or config_get_float('analytics.max_hr')
+
+        hr_zones = config_get('analytics.hr_zones')
+        if hr_zones:
+            self.hr_bounds = np.array(hr_zones, dtype=np.float64)
+        elif max_hr:
+            self.hr_bounds = np.array(HR_ZONE_MAX_HR_PCT) * max_hr
+        else:
+            self.hr_bounds = None
+        self.power_bounds = np.array(POWER_ZONE_FTP_PCT) * ftp if ftp else None
+
+    def compute(self, streams: Dict[str, np.ndarray]) -> Dict[str, Optional[float]]:
+        time = streams.get("time")
+        if time is None or len(time) < 2:
+            return {}
+
+        hr = streams.get("heartrate")
+        watts = streams.get("watts")
+        durations = sample_durations(time)
+        results: Dict[str, Optional[float]] = {}
+
+        if hr is not None and self.hr_bounds is not None:
+            results.update(zip(HR_ZONE_FIELDS, time_in_zones(hr, durations, self.hr_bounds)))
+        if watts is not None and self.power_bounds is not None:
+            results.update(zip(POWER_ZONE_FIELDS, time_in_zones(watts, durations, self.power_bounds)))
+        if watts is not None:
+            power = to_1hz(time, watts)
+            for field, window in BEST_POWER_WINDOWS.items():
+                results[field] = best_average(power, window)
+
+        output = watts if watts is not None else streams.get("velocity_smooth")
+        if hr is not None and output is not None:
+            results["aerobic_decoupling"] = decoupling(durations, hr, output)
+
+        return {k: None if v is None else round(float(v), 2) for k, v in results.items()}
+
+
+def sample_durations(time: np.ndarray) -> np.ndarray:
+    """Seconds each sample stands for; pauses longer than MAX_GAP_SECONDS count as zero"""
+    durations = np.diff(time.astype(np.float64), append=time[-1])
+    durations[durations > MAX_GAP_SECONDS] = 0
+    return durations
+
+
+def time_in_zones(values: np.ndarray, durations: np.ndarray, bounds: np.ndarray) -> List[float]:
+    valid = ~np.isnan(values)
+    zones = np.digitize(values[valid], bounds)
+    return np.bincount(zones, weights=durations[valid], minlength=len(bounds) + 1).tolist()
+
+
+def to_1hz(time: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Forward-fill samples onto a 1 s grid, with zeros during pauses"""
+    grid = np.arange(time[0], time[-1] + 1)
+    idx = np.searchsorted(time, grid, side="right") - 1
+    resampled = np.nan_to_num(values.astype(np.float64))[idx]
+    resampled[grid - time[idx] > MAX_GAP_SECONDS] = 0
+    return resampled
+
+
+def best_average(values: np.ndarray, window: int) -> Optional[float]:
+    if len(values) < window:
+        return None
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    return float((cumulative[window:] - cumulative[:-window]).max() / window)
+
+
+def normalized_power(time: np.ndarray, watts: np.ndarray) -> Optional[float]:
+    """Fourth-power mean of the 30 s rolling average power"""
+    power = to_1hz(time, watts)
+    if len(power) < 30:
+        return None
+    cumulative = np.concatenate(([0.0], np.cumsum(power)))
+    rolling = (cumulative[30:] - cumulative[:-30]) / 30
+    return float(np.mean(rolling ** 4) ** 0.25)
+
+
+def elevation_gain(altitude: np.ndarray, window: int = 5) -> Optional[float]:
+    """Total ascent of the altitude stream smoothed over ``window`` samples to drop GPS/barometer noise"""
+    altitude = altitude[~np.isnan(altitude)]
+    if len(altitude) < 2:
+        return None
+    if len(altitude) > window:
+        altitude = np.convolve(altitude, np.ones(window) / window, mode="valid")
+    climbs = np.diff(altitude)
+    return float(climbs[climbs > 0].sum())
+
+
+def decoupling(durations: np.ndarray, hr: np.ndarray, output: np.ndarray) -> Optional[float]:
+    """Pa:HR / Pw:HR drift between the first and second half of moving time, in percent"""
+    valid = ~(np.isnan(hr) | np.isnan(output))
+    durations = np.where(valid, durations, 0)
+    hr, output = np.nan_to_num(hr), np.nan_to_num(output)
+    elapsed = np.cumsum(durations)
+    if elapsed[-1] <= 0:
+        return None
+    first = elapsed <= elapsed[-1] / 2
+    second = ~first
+
+    def ratio(mask: np.ndarray) -> float:
+        weights = durations[mask]
+        return np.average(output[mask], weights=weights) / np.average(hr[mask], weights=weights)
+
+    if durations[first].sum() <= 0 or durations[second].sum() <= 0:
+        return None
+    first_ratio = ratio(first)
+    return float((first_ratio - ratio(second)) / first_ratio * 100)
@@ -0,0 +1,253 @@
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from functools import wraps
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+
+from health_tracker.data.activity_data import ActivityData
+from health_tracker.data.day_health_data import DayHealthData
+from health_tracker.utils.config_loader import config_get_float, config_get_path
+from health_tracker.utils.state_file import load_json, update_json
+
+ATL_DAYS = 7
+CTL_DAYS = 42
+BASELINE_WINDOWS = {"7d": (7, 3), "28d": (28, 14)}
+# Fallback load for activities without power or HR data (~60 per hour)
+LOAD_PER_MINUTE = 1.0
+
+RESULT_FIELDS = [
+    "hrv_7d_baseline",
+    "hrv_28d_baseline",
+    "resting_hr_7d_avg",
+    "resting_hr_28d_avg",
+    "resting_hr_trend",
+    "training_load",
+    "acute_training_load",
+    "chronic_training_load",
+    "training_stress_balance",
+]
+
+
+def _locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class TrainingMetrics:
+    """Rolling HRV / resting HR baselines and ATL/CTL/TSB training load.
+
+    Daily inputs and per-activity loads are kept in a local history file so that
+    each sync only recomputes the days affected by newly synced data instead of
+    the whole history. Concurrent runs share the file; saving merges in what
+    the others saved meanwhile and recomputes from the earliest day it changes.
+    """
+
+    def __init__(self, history_file: Optional[Path] = None):
+        self.logger = logging.getLogger("health-tracker")
+        self.history_file = history_file or config_get_path('analytics.history_file', 'analytics_history.json')
+        self.ftp = config_get_float('analytics.ftp')
+        self.threshold_hr = config_get_float('analytics.threshold_hr')
+
+        history = load_json(self.history_file)
+        self._days: Dict[str, dict] = history.get("days", {})
+        self._activities: Dict[str, dict] = history.get("activities", {})
+        self._results: Dict[str, dict] = history.get("results", {})
+        # Activity IDs per day and the latest day with any input, so recompute never scans the history
+        self._activities_by_day: Dict[str, Set[str]] = {}
+        for activity_id, activity in self._activities.items():
+            self._activities_by_day.setdefault(activity["date"], set()).add(activity_id)
+        self._last_day: Optional[str] = max(chain(self._days, self._activities_by_day), default=None)
+        # Keys recorded here since the last save, which win over the file's when merging
+        self._recorded_days: Set[str] = set()
+        self._recorded_activities: Set[str] = set()
+        self._dirty_from: Optional[str] = None
+        self._changed = False
+        # Health and activities syncs may share one instance from different threads
+        self._lock = threading.RLock()
+
+    def health_inputs(self) -> Set[str]:
+        """DayHealthData fields enrich_health reads"""
+        inputs = {"average_overnight_hrv", "resting_heart_rate"}
+        return inputs if self.ftp else inputs | {"bike_ftp"}
+
+    def activity_inputs(self) -> Set[str]:
+        """ActivityData fields record_activities reads"""
+        return {"duration_seconds", "normalized_power", "avg_hr"}
+
+    @_locked
+    def record_activities(self, activities: Iterable[ActivityData]) -> None:
+        """Store activity loads and set ``training_load`` on each activity"""
+        activities = list(activities)
+        if not activities:
+            return
+
+        frame = pd.DataFrame({
+            "duration": [a.duration_seconds for a in activities],
+            "np": [a.normalized_power for a in activities],
+            "avg_hr": [a.avg_hr for a in activities],
+        }, dtype="float64")
+        loads = self._activity_loads(frame)
+
+        for activity, load in zip(activities, loads):
+            activity.training_load = None if np.isnan(load) else round(float(load), 1)
+            self._put_activity(str(activity.id), {
+                "date": self._day_key(activity.date),
+                "sport_type": activity.sport_type,
+                "load": activity.training_load,
+            })
+            self._recorded_activities.add(str(activity.id))
+
+    @_locked
+    def enrich_health(self, days: Iterable[DayHealthData]) -> None:
+        """Store daily inputs and fill the derived fields on each ``DayHealthData``"""
+        days = list(days)
+        for data in days:
+            day = self._day_key(data.date)
+            self._put_day(day, {
+                "hrv": data.average_overnight_hrv,
+                "rhr": data.resting_heart_rate,
+                "ftp": data.bike_ftp,
+            })
+            self._recorded_days.add(day)
+
+        self.recompute()
+
+        for data in days:
+            result = self._results.get(self._day_key(data.date), {})
+            for field in RESULT_FIELDS:
+                setattr(data, field, result.get(field))
+
+    @_locked
+    def recompute(self) -> None:
+        """Recompute rolling aggregates from the earliest changed day onwards"""
+        if self._dirty_from is None:
+            return
+
+        start = pd.Timestamp(self._dirty_from)
+        end = max(pd.Timestamp(self._last_day), start)
+
+        longest_window = max(window for window, _ in BASELINE_WINDOWS.values())
+        index = pd.date_range(start - timedelta(days=longest_window - 1), end, freq="D")
+        keys = index.strftime("%Y-%m-%d")
+
+        # Only the recomputed window plus its baseline lead-in, not the whole history
+        window_days = {key: self._days[key] for key in keys if key in self._days}
+        days = pd.DataFrame.from_dict(window_days, orient="index", columns=["hrv", "rhr", "ftp"])
+        days = days.reindex(keys).astype("float64")
+
+        columns = {}
+        for suffix, (window, min_periods) in BASELINE_WINDOWS.items():
+            columns[f"hrv_{suffix}_baseline"] = days["hrv"].rolling(window, min_periods=min_periods).mean()
+            columns[f"resting_hr_{suffix}_avg"] = days["rhr"].rolling(window, min_periods=min_periods).mean()
+        columns["resting_hr_trend"] = columns["resting_hr_7d_avg"] - columns["resting_hr_28d_avg"]
+
+        loads = pd.Series(0.0, index=keys)
+        window_activities = {
+            activity_id: self._activities[activity_id]
+            for key in keys for activity_id in self._activities_by_day.get(key, ())
+        }
+        if window_activities:
+            activities = pd.DataFrame.from_dict(window_activities, orient="index")
+            daily = activities["load"].astype("float64").groupby(activities["date"]).sum(min_count=1)
+            loads = daily.reindex(keys).fillna(0.0)
+
+        tail = keys >= self._dirty_from
+        seed = self._results.get((start - timedelta(days=1)).strftime("%Y-%m-%d"), {})
+        seed_atl = seed.get("acute_training_load") or 0.0
+        seed_ctl = seed.get("chronic_training_load") or 0.0
+
+        atl = self._ewma(loads[tail], ATL_DAYS, seed_atl)
+        ctl = self._ewma(loads[tail], CTL_DAYS, seed_ctl)
+        # Form uses yesterday's fitness and fatigue, as is customary
+        tsb = (ctl.shift(1) - atl.shift(1)).fillna(seed_ctl - seed_atl)
+
+        results = pd.DataFrame(columns, index=keys)[tail]
+        results["training_load"] = loads[tail]
+        results["acute_training_load"] = atl
+        results["chronic_training_load"] = ctl
+        results["training_stress_balance"] = tsb
+        results = results.round(2).astype(object).where(results.notna(), None)
+
+        self._results.update(results.to_dict(orient="index"))
+        self._dirty_from = None
+
+    @_locked
+    def save(self) -> None:
+        """Persist the history file if anything was recorded"""
+        if not self._changed:
+            return
+        update_json(self.history_file, self._merge_into)
+        self._changed = False
+
+    def _merge_into(self, data: dict) -> None:
+        """Adopt the inputs other runs saved to ``data`` meanwhile, recompute and hand back the merged history"""
+        for day, entry in data.get("days", {}).items():
+            if day not in self._recorded_days and self._days.get(day) != entry:
+                self._put_day(day, entry)
+        for activity_id, entry in data.get("activities", {}).items():
+            if activity_id not in self._recorded_activities and self._activities.get(activity_id) != entry:
+                self._put_activity(activity_id, entry)
+        self.recompute()
+        data.update(days=self._days, activities=self._activities, results=self._results)
+        self._recorded_days.clear()
+        self._recorded_activities.clear()
+
+    def _put_day(self, day: str, entry: dict) -> None:
+        self._days[day] = entry
+        self._last_day = max(self._last_day or day, day)
+        self._mark_dirty(day)
+
+    def _put_activity(self, activity_id: str, entry: dict) -> None:
+        previous = self._activities.get(activity_id)
+        if previous and previous["date"] != entry["date"]:
+            self._activities_by_day[previous["date"]].discard(activity_id)
+            self._mark_dirty(previous["date"])
+        self._activities[activity_id] = entry
+        self._activities_by_day.setdefault(entry["date"], set()).add(activity_id)
+        self._last_day = max(self._last_day or entry["date"], entry["date"])
+        self._mark_dirty(entry["date"])
+
+    def _activity_loads(self, frame: pd.DataFrame) -> np.ndarray:
+        """TSS from power when FTP is known, hrTSS from heart rate, else duration based"""
+        hours = frame["duration"].to_numpy() / 3600
+        ftp = self.ftp or self._latest_ftp()
+
+        loads = hours * 60 * LOAD_PER_MINUTE
+        if self.threshold_hr:
+            hr_load = hours * 100 * (frame["avg_hr"].to_numpy() / self.threshold_hr) ** 2
+            loads = np.where(np.isnan(hr_load), loads, hr_load)
+        if ftp:
+            power_load = hours * 100 * (frame["np"].to_numpy() / ftp) ** 2
+            loads = np.where(np.isnan(power_load), loads, power_load)
+        return loads
+
+    def _latest_ftp(self) -> Optional[float]:
+        for day in sorted(self._days, reverse=True):
+            ftp = self._days[day].get("ftp")
+            if ftp:
+                return float(ftp)
+        return None
+
+    def _ewma(self, loads: pd.Series, days: int, seed: float) -> pd.Series:
+        seeded = pd.concat([pd.Series([seed]), loads], ignore_index=True)
+        smoothed = seeded.ewm(alpha=1 / days, adjust=False).mean().iloc[1:]
+        smoothed.index = loads.index
+        return smoothed
+
+    def _mark_dirty(self, day: str) -> None:
+        self._changed = True
+        if self._dirty_from is None or day < self._dirty_from:
+            self._dirty_from = day
+
+    def _day_key(self, value: Union[datetime, date, str]) -> str:
+        if isinstance(value, (datetime, date)):
+            return value.strftime("%Y-%m-%d")
+        return str(value)[:10]
@@ -1,9 +1,10 @@
-from dataclasses import dataclass
 from typing import Optional, Union
 from datetime import datetime
 
+from health_tracker.data.record import record
 
-@dataclass
+
+@record
 class ActivityData:
     id: str
     date: Union[datetime, str]
@@ -19,3 +20,23 @@ class ActivityData:
     normalized_power: Optional[int]
     elevation: Optional[int]
     url: Optional[str]
+    # Derived by health_tracker.analytics.training_metrics
+    training_load: Optional[float] = None
+    # Derived from activity streams by health_tracker.analytics.stream_metrics
+    hr_zone_1_seconds: Optional[float] = None
+    hr_zone_2_seconds: Optional[float] = None
+    hr_zone_3_seconds: Optional[float] = None
+    hr_zone_4_seconds: Optional[float] = None
+    hr_zone_5_seconds: Optional[float] = None
+    power_zone_1_seconds: Optional[float] = None
+    power_zone_2_seconds: Optional[float] = None
+    power_zone_3_seconds: Optional[float] = None
+    power_zone_4_seconds: Optional[float] = None
+    power_zone_5_seconds: Optional[float] = None
+    power_zone_6_seconds: Optional[float] = None
+    power_zone_7_seconds: Optional[float] = None
+    best_power_5s: Optional[float] = None
+    best_power_1m: Optional[float] = None
+    best_power_5m: Optional[float] = None
+    best_power_20m: Optional[float] = None
+    aerobic_decoupling: Optional[float] = None
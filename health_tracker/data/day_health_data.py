@@ -1,9 +1,10 @@
-from dataclasses import dataclass
 from typing import Optional, Union
 from datetime import datetime
 
+from health_tracker.data.record import record
 
-@dataclass
+
+@record
 class DayHealthData:
     date: Union[datetime, str]
     sleep_hours: Optional[float]
@@ -25,3 +26,13 @@ class DayHealthData:
     bike_vo2max: Optional[int]
     bike_ftp: Optional[int]
     total_steps: Optional[int]
+    # Derived by health_tracker.analytics.training_metrics
+    hrv_7d_baseline: Optional[float] = None
+    hrv_28d_baseline: Optional[float] = None
+    resting_hr_7d_avg: Optional[float] = None
+    resting_hr_28d_avg: Optional[float] = None
+    resting_hr_trend: Optional[float] = None
+    training_load: Optional[float] = None
+    acute_training_load: Optional[float] = None
+    chronic_training_load: Optional[float] = None
+    training_stress_balance: Optional[float] = None
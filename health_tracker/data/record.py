@@ -0,0 +1,54 @@
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, Set
+
+
+def record(cls):
+    """``@dataclass`` with ``__slots__``.
+
+    Equivalent to ``dataclass(slots=True)``, which is only available from
+    Python 3.10. Slotted records have no per-instance ``__dict__``, which keeps
+    large syncs and backfills smaller (see ``benchmarks/record_memory.py``).
+    """
+    cls = dataclass(cls)
+    names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+def numeric_fields(record_cls: type) -> Set[str]:
+    """Names of fields annotated as int/float (optionally ``Optional``)"""
+    numeric = set()
+    for f in fields(record_cls):
+        args = getattr(f.type, "__args__", (f.type,))
+        if all(arg in (int, float, type(None)) for arg in args):
+            numeric.add(f.name)
+    return numeric
+
+
+def to_json_dict(obj) -> Dict[str, Any]:
+    """Fields of a record as JSON types; datetime fields are listed so from_json_dict restores them"""
+    data: Dict[str, Any] = {}
+    datetimes = []
+    for f in fields(obj):
+        value = getattr(obj, f.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+            datetimes.append(f.name)
+        elif hasattr(value, "item"):  # numpy scalar
+            value = value.item()
+        data[f.name] = value
+    if datetimes:
+        data["__datetimes__"] = datetimes
+    return data
+
+
+def from_json_dict(record_cls: type, data: Dict[str, Any]):
+    data = dict(data)
+    for name in data.pop("__datetimes__", []):
+        data[name] = datetime.fromisoformat(data[name])
+    return record_cls(**data)
@@ -0,0 +1,89 @@
+from dataclasses import fields
+from typing import Any, Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from health_tracker.data.record import numeric_fields
+
+
+class RecordBatch(Sequence):
+    """Columnar container for many records of one type.
+
+    Numeric fields are stored as float64 NumPy arrays (NaN for missing values),
+    all other fields as object arrays. Indexing and iteration yield record
+    instances, so a batch can be passed anywhere a list of records is accepted,
+    while analytics and export can work on whole columns at once.
+    """
+
+    def __init__(self, record_cls: type, columns: Dict[str, np.ndarray]):
+        self.record_cls = record_cls
+        self.fields = [f.name for f in fields(record_cls)]
+        self.numeric_fields = numeric_fields(record_cls)
+        self._int_fields = {
+            f.name for f in fields(record_cls)
+            if f.name in self.numeric_fields and int in getattr(f.type, "__args__", (f.type,))
+        }
+        self._columns = columns
+        self._length = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def from_records(cls, record_cls: type, records: Iterable[Any]) -> "RecordBatch":
+        records = list(records)
+        numeric = numeric_fields(record_cls)
+        columns = {}
+        for name in (f.name for f in fields(record_cls)):
+            values = [getattr(r, name) for r in records]
+            if name in numeric:
+                columns[name] = np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+            else:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+                columns[name] = column
+        return cls(record_cls, columns)
+
+    @classmethod
+    def concat(cls, batches: Sequence["RecordBatch"]) -> "RecordBatch":
+        if not batches:
+            raise ValueError("Cannot concatenate an empty list of batches")
+        record_cls = batches[0].record_cls
+        columns = {
+            name: np.concatenate([b.column(name) for b in batches])
+            for name in batches[0].fields
+        }
+        return cls(record_cls, columns)
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def to_records(self) -> List[Any]:
+        return [self._record_at(i) for i in range(self._length)]
+
+    def to_pandas(self) -> pd.DataFrame:
+        return pd.DataFrame(self._columns, columns=self.fields)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return RecordBatch(self.record_cls, {name: col[index] for name, col in self._columns.items()})
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("RecordBatch index out of range")
+        return self._record_at(index)
+
+    def _record_at(self, index: int) -> Any:
+        values = {}
+        for name in self.fields:
+            value = self._columns[name][index]
+            if name in self.numeric_fields:
+                if np.isnan(value):
+                    value = None
+                elif name in self._int_fields and float(value).is_integer():
+                    value = int(value)
+                else:
+                    value = float(value)
+            values[name] = value
+        return self.record_cls(**values)
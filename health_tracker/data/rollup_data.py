@@ -0,0 +1,21 @@
+from typing import Optional
+
+from health_tracker.data.record import record
+
+
+@record
+class RollupData:
+    # "<label> <sport_type>", e.g. "2024-W03 All" or "2024-01 Ride"
+    key: str
+    period: str
+    label: str
+    period_start: str
+    period_end: str
+    # "All" for the totals across sports, which also carry the health averages
+    sport_type: str
+    activity_count: int
+    distance_km: float
+    duration_hours: float
+    average_sleep_hours: Optional[float] = None
+    average_overnight_hrv: Optional[float] = None
+    average_resting_heart_rate: Optional[float] = None
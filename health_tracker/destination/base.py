@@ -1,15 +1,32 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Sequence, Tuple
 
 from health_tracker.data.day_health_data import DayHealthData
 from health_tracker.data.activity_data import ActivityData
+from health_tracker.data.rollup_data import RollupData
 
 
 class Destination(ABC):
+    # True when update_activities is keyed by activity ID, so resyncing an activity is safe
+    upserts_activities = False
+
+    def prepare(self) -> None:
+        """Validate the configuration against the destination before anything is fetched"""
+
     @abstractmethod
     def update_health_data(self, date: str, data: DayHealthData) -> None:
         pass
 
+    def update_health_batch(self, items: Sequence[Tuple[str, DayHealthData]]) -> None:
+        """Write several days at once; destinations with a bulk API override this"""
+        for date, data in items:
+            self.update_health_data(date, data)
+
     @abstractmethod
-    def update_activities(self, activities: List[ActivityData]) -> None:
-        pass
\ No newline at end of file
+    def update_activities(self, activities: Sequence[ActivityData]) -> None:
+        pass
+
+    @abstractmethod
+    def update_rollups(self, rollups: Sequence[RollupData]) -> None:
+        """Insert or update weekly / monthly rollup rows, keyed by ``RollupData.key``"""
+        pass
@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Sequence, Set, Tuple
 from enum import Enum
 from functools import cached_property
 
 from health_tracker.data.day_health_data import DayHealthData
 from health_tracker.data.activity_data import ActivityData
+from health_tracker.data.rollup_data import RollupData
 from health_tracker.destination.google_sheets import GoogleSheets
 from health_tracker.destination.notion import Notion
 from health_tracker.utils.mapping_loader import MappingLoader, TargetType as MappingTargetType, DataType
@@ -33,6 +34,10 @@ class Target:
     def label(self) -> str:
         return self.target_type.value
 
+    @property
+    def upserts_activities(self) -> bool:
+        return self.instance.upserts_activities
+
     def get_activity_mapping(self) -> dict:
         """Get mapping configuration for activities"""
         mapping_target = MappingTargetType(self.target_type.value)
@@ -43,14 +48,43 @@ class Target:
         mapping_target = MappingTargetType(self.target_type.value)
         return self._mapping_loader.load_mapping(mapping_target, DataType.HEALTH)
 
+    def get_rollup_mapping(self) -> dict:
+        """Get mapping configuration for weekly / monthly rollups"""
+        mapping_target = MappingTargetType(self.target_type.value)
+        return self._mapping_loader.load_mapping(mapping_target, DataType.ROLLUP)
+
+    def prepare(self) -> None:
+        """Authenticate and validate the destination before any upstream call"""
+        self.instance.prepare()
+
+    def health_fields(self) -> Set[str]:
+        """DayHealthData fields referenced by the health mapping"""
+        return self._mapped_fields(self.get_health_mapping())
+
+    def activity_fields(self) -> Set[str]:
+        """ActivityData fields referenced by the activity mapping"""
+        return self._mapped_fields(self.get_activity_mapping())
+
+    def _mapped_fields(self, mapping: dict) -> Set[str]:
+        # Sheets maps column -> field, Notion maps field -> property
+        return set(mapping.values()) if self.target_type == TargetType.SHEETS else set(mapping)
+
     def update_health_data(self, date: str, data: DayHealthData) -> None:
         """Update health data for a specific date"""
         self.instance.update_health_data(date, data)
 
-    def update_activities(self, activities: List[ActivityData]) -> None:
+    def update_health_batch(self, items: Sequence[Tuple[str, DayHealthData]]) -> None:
+        """Update health data for several dates at once"""
+        self.instance.update_health_batch(items)
+
+    def update_activities(self, activities: Sequence[ActivityData]) -> None:
         """Update activities data"""
         self.instance.update_activities(activities)
 
+    def update_rollups(self, rollups: Sequence[RollupData]) -> None:
+        """Update weekly / monthly rollup rows"""
+        self.instance.update_rollups(rollups)
+
     @classmethod
     def from_label(cls, label: str) -> "Target":
         """Create a Target instance from a label string"""
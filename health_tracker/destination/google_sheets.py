@@ -1,60 +1,118 @@
 import os
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 import gspread
 
 from health_tracker.data.day_health_data import DayHealthData
 from health_tracker.data.activity_data import ActivityData
+from health_tracker.data.rollup_data import RollupData
 from health_tracker.destination.base import Destination
 from health_tracker.utils.config_loader import config_get, config_get_path
+from health_tracker.utils.instrumentation import api_call
+from health_tracker.utils.transport import configure_session
 from health_tracker.destination.mapper.sheets_health_mapper import SheetsHealthMapper
 from health_tracker.destination.mapper.sheets_activity_mapper import SheetsActivityMapper
+from health_tracker.destination.mapper.sheets_rollup_mapper import SheetsRollupMapper
 
 
 class GoogleSheets(Destination):
     """Destination that writes health & activities data directly into Google Sheets."""
 
-    def __init__(self):
-        creds_file = config_get_path('google_sheets.credentials_file')
-        if not creds_file or not creds_file.exists():
-            raise ValueError("Missing Google Sheets credentials file. Configure in config.yaml")
-
-        gc = gspread.service_account(filename=str(creds_file))
+    def __init__(self, client: Optional[gspread.Client] = None):
+        gc = client or self._authorize()
 
         spreadsheet_url = config_get('google_sheets.spreadsheet_url')
         if not spreadsheet_url:
             raise ValueError("Missing Google Sheets spreadsheet URL. Set GOOGLE_SHEETS_SPREADSHEET_URL env var or configure in config.yaml")
 
-        self.spreadsheet = gc.open_by_url(spreadsheet_url)
+        self.spreadsheet = api_call("sheets", "open_by_url", gc.open_by_url, spreadsheet_url)
         
         self.health_mapper = SheetsHealthMapper()
         self.activity_mapper = SheetsActivityMapper()
+        self.rollup_mapper = SheetsRollupMapper()
+
+        # upsert: rewrite the row holding the activity ID instead of always appending
+        self.upserts_activities = str(config_get('google_sheets.activities_write_mode', 'append')).lower() == "upsert"
+        self.activity_id_column = next((col for col, field in self.activity_mapper.mapping.items() if field == "id"), None)
+        if self.upserts_activities and not self.activity_id_column:
+            raise ValueError("google_sheets.activities_write_mode: upsert needs an id column in the Sheets activity mapping")
+
+        # Worksheet handles and row positions are looked up once per run
+        self._worksheets: Dict[str, gspread.Worksheet] = {}
+        self._date_rows: Dict[str, Dict[str, int]] = {}
+        self._activity_rows: Dict[str, Dict[str, int]] = {}
+        self._next_rows: Dict[str, int] = {}
+
+    def _authorize(self) -> gspread.Client:
+        creds_file = config_get_path('google_sheets.credentials_file')
+        if not creds_file or not creds_file.exists():
+            raise ValueError("Missing Google Sheets credentials file. Configure in config.yaml")
+
+        gc = api_call("sheets", "service_account", gspread.service_account, filename=str(creds_file))
+        # gspread 6 keeps the session on http_client, gspread 5 on the client itself
+        configure_session(getattr(gc, "http_client", gc).session)
+        return gc
 
     def update_health_data(self, date: str, data: DayHealthData):
+        self.update_health_batch([(date, data)])
+
+    def update_health_batch(self, items: Sequence[Tuple[str, DayHealthData]]):
+        """Write several days with a single values_batch_update request"""
         worksheet_name = config_get('google_sheets.worksheets.health', env_key='HEALTH_WORKSHEET_NAME')
-        ws = self.spreadsheet.worksheet(worksheet_name)
+        self._write_keyed_rows(self._worksheet(worksheet_name),
+                               [(date, self.health_mapper.map_health(data)) for date, data in items])
 
-        row = self._find_or_create_row_by_date(ws, date)
-        updates = self.health_mapper.map_health(data)
-        
-        for update in updates:
-            update["range"] = f"{worksheet_name}!{update['range']}{row}"
-        
-        updates.append({
-            "range": f"{ws.title}!A{row}",
-            "values": [[date]]
-        })
-        
-        self._batch_update(ws, updates)
+    def update_rollups(self, rollups: Sequence[RollupData]):
+        """Write rollup rows keyed by column A in one request"""
+        worksheet_name = config_get('google_sheets.worksheets.rollups', 'Rollups', env_key='ROLLUPS_WORKSHEET_NAME')
+        self._write_keyed_rows(self._worksheet(worksheet_name),
+                               [(rollup.key, self.rollup_mapper.map(rollup)) for rollup in rollups])
 
-    def update_activities(self, activities: List[ActivityData]):
+    def _write_keyed_rows(self, ws, items: Sequence[Tuple[str, List[dict]]]):
+        """Write mapped updates to the row whose column A holds the key, appending unknown keys"""
+        key_rows = self._get_date_rows(ws)
+        next_row = self._next_rows[ws.title]
+
+        new_rows = {}
+        batch_requests = []
+        for key, updates in items:
+            row = key_rows.get(key) or new_rows.get(key)
+            if row is None:
+                row = new_rows[key] = next_row
+                next_row += 1
+
+            for update in updates:
+                update["range"] = f"{ws.title}!{update['range']}{row}"
+
+            updates.append({
+                "range": f"{ws.title}!A{row}",
+                "values": [[key]]
+            })
+            batch_requests.extend(updates)
+
+        self._batch_update(ws, batch_requests)
+        key_rows.update(new_rows)
+        self._next_rows[ws.title] = next_row
+
+    def update_activities(self, activities: Sequence[ActivityData]):
+        """Append activities, or with upsert mode rewrite the rows of already synced IDs, in one request"""
         worksheet_name = config_get('google_sheets.worksheets.activities', env_key='ACTIVITIES_WORKSHEET_NAME')
-        ws = self.spreadsheet.worksheet(worksheet_name)
-        values = ws.get_all_values()
-        next_row = len(values) + 1
+        ws = self._worksheet(worksheet_name)
+        if self.upserts_activities:
+            activity_rows = self._get_activity_rows(ws)
+        else:
+            activity_rows = {}
+            if ws.title not in self._next_rows:
+                values = api_call("sheets", "get_all_values", ws.get_all_values)
+                self._next_rows[ws.title] = len(values) + 1
+        next_row = self._next_rows[ws.title]
 
+        new_rows = {}
         batch_requests = []
-        for i, activity in enumerate(activities, start=0):
-            row = next_row + i
+        for activity in activities:
+            row = activity_rows.get(activity.id) or new_rows.get(activity.id)
+            if row is None:
+                row = new_rows[activity.id] = next_row
+                next_row += 1
             updates = self.activity_mapper.map(activity)
             
             for update in updates:
@@ -68,19 +126,52 @@ class GoogleSheets(Destination):
             batch_requests.extend(updates)
 
         self._batch_update(ws, batch_requests)
+        activity_rows.update(new_rows)
+        self._next_rows[ws.title] = next_row
 
-    def _find_or_create_row_by_date(self, ws, date: str) -> int:
-        values = ws.col_values(1)
-        if date in values:
-            return values.index(date) + 1
-        else:
-            next_row = len(values) + 1
-            ws.update_cell(next_row, 1, date)
-            return next_row
+    def _worksheet(self, name: str) -> gspread.Worksheet:
+        if name not in self._worksheets:
+            self._worksheets[name] = api_call("sheets", "worksheet", self.spreadsheet.worksheet, name)
+        return self._worksheets[name]
+
+    def _get_date_rows(self, ws) -> Dict[str, int]:
+        """Row number of every date (or rollup key) in column A, read once per worksheet"""
+        if ws.title not in self._date_rows:
+            values = api_call("sheets", "col_values", ws.col_values, 1)
+            rows = {}
+            for i, value in enumerate(values, start=1):
+                rows.setdefault(value, i)
+            self._date_rows[ws.title] = rows
+            self._next_rows[ws.title] = len(values) + 1
+        return self._date_rows[ws.title]
+
+    def _get_activity_rows(self, ws) -> Dict[str, int]:
+        """Row number of every activity ID, read together with the date column in one request"""
+        if ws.title not in self._activity_rows:
+            id_range = f"{self.activity_id_column}:{self.activity_id_column}"
+            dates, ids = api_call(
+                "sheets", "batch_get", ws.batch_get, ["A:A", id_range],
+                major_dimension="COLUMNS", value_render_option="UNFORMATTED_VALUE"
+            )
+            dates, ids = (dates[0] if dates else []), (ids[0] if ids else [])
+            rows = {}
+            for i, value in enumerate(ids, start=1):
+                if value != "":
+                    rows.setdefault(_cell_text(value), i)
+            self._activity_rows[ws.title] = rows
+            self._next_rows[ws.title] = max(len(dates), len(ids)) + 1
+        return self._activity_rows[ws.title]
 
     def _batch_update(self, ws, updates: List[dict]):
         if not updates:
             return
 
         body = {"valueInputOption": "USER_ENTERED", "data": updates}
-        ws.spreadsheet.values_batch_update(body)
+        api_call("sheets", "values_batch_update", ws.spreadsheet.values_batch_update, body)
+
+
+def _cell_text(value) -> str:
+    """IDs written before they were stored as text come back as numbers"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
@@ -25,6 +25,9 @@ class SheetsActivityMapper(AbstractActivityMapper):
                         value = f'=HYPERLINK("{value}";"View")'
                     elif field == "duration_seconds" and isinstance(value, (int, float)):
                         value = f"=TIME(0;0;{value})"
+                    elif field == "id":
+                        # Keep IDs as text, so Sheets never turns them into numbers
+                        value = f"'{value}"
                     
                     updates.append({
                         "range": f"${self.ws_title}!{col}",
@@ -0,0 +1,27 @@
+from typing import List
+
+from health_tracker.data.rollup_data import RollupData
+from health_tracker.utils.mapping_loader import load_rollup_mapping, TargetType
+
+
+class SheetsRollupMapper:
+    """Google Sheets weekly / monthly rollup mapper"""
+
+    def __init__(self):
+        self.mapping = load_rollup_mapping(TargetType.SHEETS)
+
+    def map(self, rollup: RollupData) -> List[dict]:
+        """Map a rollup row to Google Sheets format; the key column is written by the destination"""
+        updates = []
+
+        for col, field in self.mapping.items():
+            if field == "key" or not hasattr(rollup, field):
+                continue
+            value = getattr(rollup, field)
+            if value is not None:
+                updates.append({
+                    "range": f"{col}",
+                    "values": [[value]]
+                })
+
+        return updates
@@ -1,49 +1,140 @@
+import logging
 import os
-from typing import List
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
 from health_tracker.data.activity_data import ActivityData
 from health_tracker.data.day_health_data import DayHealthData
+from health_tracker.data.rollup_data import RollupData
 from health_tracker.destination.base import Destination
+from health_tracker.destination.notion_page_index import NotionPageIndex
+from health_tracker.destination.notion_schema import NotionSchemaCache, check_mapping
 from health_tracker.utils.config_loader import config_get
+from health_tracker.utils.instrumentation import api_call
+from health_tracker.utils.transport import httpx_client, transport_settings
 from notion_client import Client
+from notion_client.errors import APIErrorCode
 from health_tracker.destination.mapper.notion_mapper import NotionMapper
 
 
 class Notion(Destination):
-    def __init__(self):
-        self.client = Client(auth=os.environ.get("NOTION_SECRET"))
+    def __init__(self, client: Optional[Client] = None, page_index_file: Optional[Path] = None,
+                 schema_cache_file: Optional[Path] = None):
+        self.logger = logging.getLogger("health-tracker")
+        self.client = client or Client(
+            auth=os.environ.get("NOTION_SECRET"),
+            client=httpx_client(),
+            timeout_ms=int(transport_settings().read_timeout * 1000),
+        )
         self.mapper = NotionMapper()
+        self.page_index = NotionPageIndex(page_index_file)
+        self.schema = NotionSchemaCache(self.client, schema_cache_file)
+        self.schema_check = str(config_get('notion.schema_check', 'strict')).lower()
+        self._prepared = False
+
+    def prepare(self) -> None:
+        """Check the health and activity mappings against the database schemas before any sync.
+
+        ``notion.schema_check``: strict raises on mismatches, prune drops the
+        mismatched properties from every payload, off skips the check.
+        """
+        if self._prepared or self.schema_check == "off":
+            return
+
+        problems = []
+        for kind, database_id, attr in (
+            ("health", config_get('notion.databases.health', env_key='NOTION_HEALTH_DATABASE_ID'), "health_mapping"),
+            ("activities", config_get('notion.databases.activities', env_key='NOTION_ACTIVITIES_DATABASE_ID'),
+             "activity_mapping"),
+            ("rollups", config_get('notion.databases.rollups', env_key='NOTION_ROLLUPS_DATABASE_ID'), "rollup_mapping"),
+        ):
+            if not database_id:
+                continue
+            mapping = getattr(self.mapper, attr)
+            valid, found = check_mapping(mapping, self.schema.properties(database_id))
+            if found:
+                # The cached schema may predate a fix in Notion
+                valid, found = check_mapping(mapping, self.schema.properties(database_id, refresh=True))
+            setattr(self.mapper, attr, valid)
+            problems += [f"{kind} {problem}" for problem in found]
+
+        if problems and self.schema_check == "strict":
+            raise ValueError("Notion mapping does not match the database schema "
+                             "(set notion.schema_check: prune to skip these properties):\n  " + "\n  ".join(problems))
+        for problem in problems:
+            self.logger.warning(f"Skipping Notion property, {problem}")
+        self._prepared = True
 
     def update_health_data(self, date: str, data: DayHealthData) -> None:
-        data = self.mapper.map_health(data)
+        self.update_health_batch([(date, data)])
+
+    def update_health_batch(self, items: Sequence[Tuple[str, DayHealthData]]) -> None:
         database_id = config_get('notion.databases.health', env_key='NOTION_HEALTH_DATABASE_ID')
         if not database_id:
             raise ValueError("Missing Notion health database ID. Set NOTION_HEALTH_DATABASE_ID env var or configure in config.yaml")
         
-        page_id = self._get_or_create_page(database_id, date)
+        try:
+            for date, data in items:
+                data = self.mapper.map_health(data)
+                self._update_page(database_id, date, data.get("properties"))
+        finally:
+            self.page_index.save()
 
-        self.client.pages.update(
-            page_id=page_id,
-            properties=data.get("properties")
-        )
-
-    def update_activities(self, activities: List[ActivityData]) -> None:
+    def update_activities(self, activities: Sequence[ActivityData]) -> None:
         database_id = config_get('notion.databases.activities', env_key='NOTION_ACTIVITIES_DATABASE_ID')
         if not database_id:
             raise ValueError("Missing Notion activities database ID. Set NOTION_ACTIVITIES_DATABASE_ID env var or configure in config.yaml")
 
-        for activity in activities:
-            page_id = self._get_or_create_page(database_id, activity.date.strftime("%Y-%m-%d %H:%M:%S"))
-            data = self.mapper.map_activity(activity)
+        try:
+            for activity in activities:
+                data = self.mapper.map_activity(activity)
+                self._update_page(database_id, activity.date.strftime("%Y-%m-%d %H:%M:%S"), data.get("properties"))
+        finally:
+            self.page_index.save()
+
+    def update_rollups(self, rollups: Sequence[RollupData]) -> None:
+        database_id = config_get('notion.databases.rollups', env_key='NOTION_ROLLUPS_DATABASE_ID')
+        if not database_id:
+            raise ValueError("Missing Notion rollups database ID. Set NOTION_ROLLUPS_DATABASE_ID env var or configure in config.yaml")
+
+        try:
+            for rollup in rollups:
+                data = self.mapper.map_rollup(rollup)
+                self._update_page(database_id, rollup.key, data.get("properties"), page_date=rollup.period_start)
+        finally:
+            self.page_index.save()
+
+    def _update_page(self, database_id: str, title: str, properties: dict, page_date: Optional[str] = None) -> None:
+        """Update the page titled ``title``, resolving it through the page index first.
+
+        New pages get ``page_date`` (default: the title) as their Date.
+        """
+        page_id = self.page_index.get(database_id, title)
+        if page_id:
+            try:
+                api_call("notion", "pages.update", self.client.pages.update, page_id=page_id, properties=properties)
+                return
+            except Exception as e:
+                if not self._is_stale(e):
+                    raise
+                # Page deleted, archived or moved since it was indexed
+                self.page_index.discard(database_id, title)
 
-            self.client.pages.update(
-                page_id=page_id,
-                properties=data.get("properties")
-            )
+        page_id = self._get_or_create_page(database_id, title, page_date)
+        api_call("notion", "pages.update", self.client.pages.update, page_id=page_id, properties=properties)
 
+    @staticmethod
+    def _is_stale(e: Exception) -> bool:
+        """Whether a pages.update failed because the indexed page is gone"""
+        code = getattr(e, "code", None)
+        if code == APIErrorCode.ObjectNotFound:
+            return True
+        # Updating an archived (trashed) page is rejected as a validation error
+        return code == APIErrorCode.ValidationError and "archived" in str(e).lower()
 
-    def _get_or_create_page(self, database_id: str, date: str) -> str:
+    def _get_or_create_page(self, database_id: str, date: str, page_date: Optional[str] = None) -> str:
         """Returns page_id"""
-        query = self.client.databases.query(
+        query = api_call(
+            "notion", "databases.query", self.client.databases.query,
             **{
                 "database_id": database_id,
                 "filter": {
@@ -57,18 +148,21 @@ class Notion(Destination):
 
         results = query.get("results", [])
         if results:
-            page = results[0]
-            return page["id"]
+            page_id = results[0]["id"]
         else:
-            return self._create_page(database_id, date)
+            page_id = self._create_page(database_id, date, page_date)
+        self.page_index.put(database_id, date, page_id)
+        return page_id
 
-    def _create_page(self, database_id: str, date: str):
+    def _create_page(self, database_id: str, date: str, page_date: Optional[str] = None):
         """Returns page_id"""
         import logging
 
-        iso_date = self._normalize_date(date)
+        iso_date = self._normalize_date(page_date or date)
 
-        page = self.client.pages.create(
+        # Not retried on 5xx or timeouts: the page may already exist and a retry would duplicate it
+        page = api_call(
+            "notion", "pages.create", self.client.pages.create, idempotent=False,
             parent={"database_id": database_id},
             properties={
                 "Title": {
@@ -0,0 +1,53 @@
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from health_tracker.utils.config_loader import config_get_path
+from health_tracker.utils.state_file import load_json, update_json
+
+
+class NotionPageIndex:
+    """Persistent (database_id, title) -> page_id map, so known pages skip the databases.query lookup.
+
+    Entries are trusted until Notion answers object_not_found for them; the
+    caller then drops the entry and looks the page up again. Saving merges the
+    entries put or discarded here into the file, so concurrent runs keep each
+    other's pages.
+    """
+
+    def __init__(self, index_file: Optional[Path] = None):
+        self.index_file = index_file or config_get_path('notion.page_index_file', 'notion_page_index.json')
+        self._pages: Dict[str, Dict[str, str]] = load_json(self.index_file)
+        # (database_id, title) -> page_id put since the last save, None when discarded
+        self._changes: Dict[Tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, database_id: str, title: str) -> Optional[str]:
+        with self._lock:
+            return self._pages.get(database_id, {}).get(title)
+
+    def put(self, database_id: str, title: str, page_id: str) -> None:
+        with self._lock:
+            pages = self._pages.setdefault(database_id, {})
+            if pages.get(title) != page_id:
+                pages[title] = page_id
+                self._changes[(database_id, title)] = page_id
+
+    def discard(self, database_id: str, title: str) -> None:
+        with self._lock:
+            if self._pages.get(database_id, {}).pop(title, None) is not None:
+                self._changes[(database_id, title)] = None
+
+    def save(self) -> None:
+        with self._lock:
+            if self._changes:
+                self._pages = update_json(self.index_file, self._merge_into)
+                self._changes = {}
+
+    def _merge_into(self, data: Dict[str, Dict[str, str]]) -> None:
+        for (database_id, title), page_id in self._changes.items():
+            pages = data.setdefault(database_id, {})
+            if page_id is None:
+                pages.pop(title, None)
+            else:
+                pages[title] = page_id
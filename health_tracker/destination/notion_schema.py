@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from health_tracker.utils.config_loader import config_get_float, config_get_path
+from health_tracker.utils.instrumentation import api_call
+
+# Property types NotionMapper knows how to write
+SUPPORTED_TYPES = {"number", "rich_text", "title", "date", "select", "url"}
+
+
+class NotionSchemaCache:
+    """Property name -> type of each Notion database, fetched once per ``notion.schema_ttl_seconds``"""
+
+    def __init__(self, client, cache_file: Optional[Path] = None):
+        self.client = client
+        self.cache_file = cache_file or config_get_path('notion.schema_cache_file', 'notion_schema_cache.json')
+        self.ttl = config_get_float('notion.schema_ttl_seconds', 86400.0)
+        self._schemas: Dict[str, dict] = self._load()
+        self._lock = threading.Lock()
+
+    def properties(self, database_id: str, refresh: bool = False) -> Dict[str, str]:
+        with self._lock:
+            cached = self._schemas.get(database_id)
+            if cached and not refresh and time.time() - cached["fetched_at"] < self.ttl:
+                return cached["properties"]
+
+            database = api_call("notion", "databases.retrieve", self.client.databases.retrieve,
+                                database_id=database_id)
+            properties = {name: prop.get("type") for name, prop in (database.get("properties") or {}).items()}
+            self._schemas[database_id] = {"fetched_at": time.time(), "properties": properties}
+            self._save()
+            return properties
+
+    def _save(self) -> None:
+        tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self._schemas, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.cache_file)
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+
+def check_mapping(mapping: dict, properties: Dict[str, str]) -> Tuple[dict, List[str]]:
+    """Split a Notion field mapping into the entries the database accepts and a list of problems"""
+    valid, problems = {}, []
+    for field, cfg in mapping.items():
+        name, kind = cfg.get("name"), cfg.get("type")
+        if kind not in SUPPORTED_TYPES:
+            problems.append(f"{field}: unsupported property type {kind!r}")
+        elif name not in properties:
+            problems.append(f"{field}: property {name!r} does not exist")
+        elif properties[name] != kind:
+            problems.append(f"{field}: property {name!r} is {properties[name]} in Notion, {kind} in the mapping")
+        else:
+            valid[field] = cfg
+    return valid, problems
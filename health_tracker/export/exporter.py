@@ -0,0 +1,47 @@
+import logging
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+import pandas as pd
+
+from health_tracker.data.day_health_data import DayHealthData
+from health_tracker.data.record_batch import RecordBatch
+from health_tracker.export.writers import ExportWriter
+from health_tracker.provider.activities.activities_source import ActivitiesSource
+from health_tracker.provider.health.health_source import HealthSource
+from health_tracker.utils.config_loader import config_get_int
+
+
+class Exporter:
+    """Streams records from a provider into an export writer in bounded-size chunks"""
+
+    def __init__(self, chunk_size: Optional[int] = None):
+        self.logger = logging.getLogger("health-tracker")
+        self.chunk_size = chunk_size or config_get_int('export.chunk_size', 500)
+
+    def export_health(self, source: HealthSource, start_date: str, end_date: str, writer: ExportWriter) -> int:
+        return self._write_chunks(self._iter_health(source, start_date, end_date), writer)
+
+    def export_activities(self, source: ActivitiesSource, start_date: str, end_date: str, writer: ExportWriter) -> int:
+        provider = source.provider()
+        records = provider.iter_activities_by_date_range(start_date, end_date)
+        return self._write_chunks(records, writer)
+
+    def _iter_health(self, source: HealthSource, start_date: str, end_date: str) -> Iterator[DayHealthData]:
+        provider = source.provider
+        for current_date in pd.date_range(start=start_date, end=end_date, freq="D").strftime("%Y-%m-%d"):
+            try:
+                yield provider.get_data_for_date(current_date)
+            except Exception as e:
+                self.logger.warning(f"Skipping {current_date} in export: {e}")
+
+    def _write_chunks(self, records: Iterable, writer: ExportWriter) -> int:
+        records = iter(records)
+        total = 0
+        while True:
+            chunk = RecordBatch.from_records(writer.record_cls, islice(records, self.chunk_size))
+            if not chunk:
+                return total
+            writer.write_chunk(chunk)
+            total += len(chunk)
+            self.logger.info(f"Exported {total} records to {writer.path}")
@@ -0,0 +1,135 @@
+import csv
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Sequence
+
+from health_tracker.data.record import numeric_fields
+from health_tracker.data.record_batch import RecordBatch
+from health_tracker.utils.config_loader import config_get
+
+
+class ExportWriter(ABC):
+    """Writes records to a file one chunk at a time"""
+
+    extension = ""
+
+    def __init__(self, path: Path, record_cls: type):
+        self.path = Path(path)
+        self.record_cls = record_cls
+        self.columns = [f.name for f in fields(record_cls)]
+        self.numeric_columns = numeric_fields(record_cls)
+
+    @abstractmethod
+    def write_chunk(self, records: Sequence[Any]) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _cell(self, column: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.strftime(config_get('data.datetime_format'))
+        if isinstance(value, date):
+            return value.strftime(config_get('data.date_format'))
+        if column in self.numeric_columns:
+            return value
+        return str(value)
+
+
+class CsvExportWriter(ExportWriter):
+    extension = "csv"
+
+    def __init__(self, path: Path, record_cls: type):
+        super().__init__(path, record_cls)
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def write_chunk(self, records: Sequence[Any]) -> None:
+        self._writer.writerows(
+            [self._cell(c, getattr(record, c, None)) for c in self.columns] for record in records
+        )
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetExportWriter(ExportWriter):
+    """Writes each chunk as its own row group, so memory use is bounded by the chunk size"""
+
+    extension = "parquet"
+
+    def __init__(self, path: Path, record_cls: type):
+        super().__init__(path, record_cls)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow. Install it with: pip install 'health-activity-tracker[parquet]'")
+
+        self._pa = pa
+        # Numeric columns are float64 so missing values stay nullable
+        self._schema = pa.schema([
+            (c, pa.float64() if c in self.numeric_columns else pa.string()) for c in self.columns
+        ])
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+
+    def write_chunk(self, records: Sequence[Any]) -> None:
+        if isinstance(records, RecordBatch):
+            data = {
+                c: self._pa.array(records.column(c), from_pandas=True) if c in self.numeric_columns
+                else [self._cell(c, v) for v in records.column(c)]
+                for c in self.columns
+            }
+        else:
+            data = {c: [self._cell(c, getattr(record, c, None)) for record in records] for c in self.columns}
+            for c in self.numeric_columns:
+                data[c] = [None if v is None else float(v) for v in data[c]]
+        self._writer.write_table(self._pa.Table.from_pydict(data, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class ExportFormat(Enum):
+    CSV = ("csv", CsvExportWriter)
+    PARQUET = ("parquet", ParquetExportWriter)
+
+    def __init__(self, label: str, writer_cls):
+        self._label = label
+        self._writer_cls = writer_cls
+
+    @property
+    def label(self) -> str:
+        return self._label
+
+    def writer(self, path: Path, record_cls: type) -> ExportWriter:
+        return self._writer_cls(path, record_cls)
+
+    @classmethod
+    def choices(cls):
+        return [f.label for f in cls]
+
+    @classmethod
+    def help(cls):
+        return f"Export formats: {', '.join(cls.choices())}"
+
+    @classmethod
+    def from_label(cls, label: str) -> "ExportFormat":
+        for f in cls:
+            if f.label.lower() == label.lower():
+                return f
+        raise ValueError(f"{label} is not a valid {cls.__name__}")
@@ -1,43 +1,63 @@
+from health_tracker.utils.profiling import start_from_argv, start_profiling
+# Before any other import, so --profile also covers import time
+start_from_argv()
+
 from datetime import date, timedelta, datetime
-import sys
+import time
 
 import click
-import logging
 from dotenv import load_dotenv
 
+from health_tracker.data.activity_data import ActivityData
+from health_tracker.data.day_health_data import DayHealthData
 from health_tracker.destination.destination import Target
+from health_tracker.export.exporter import Exporter
+from health_tracker.export.writers import ExportFormat
 from health_tracker.provider.activities.activities_source import ActivitiesSource
 from health_tracker.provider.health.health_source import HealthSource
-from health_tracker.utils.config_loader import config_get, config_get_path, config_get_int
+from health_tracker.utils.config_loader import config_get, config_get_path, config_get_int, config_get_bool
+from health_tracker.utils.instrumentation import get_instrumentation
+from health_tracker.utils.logging_config import setup_logging
 
+from health_tracker.profile_runner import ProfileRunner
 from health_tracker.sync_service import SyncService
 from health_tracker.utils.click_styling import info, error, success, warn, step
 
 load_dotenv()
 
-formatter = logging.Formatter(
-    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+setup_logging()
 
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.DEBUG)
-console_handler.setFormatter(formatter)
 
-log_file_path = config_get_path('logging.file_path', '/var/log/health-activity-tracker.log')
-file_handler = logging.FileHandler(log_file_path, mode="a")
-file_handler.setLevel(logging.INFO)
-file_handler.setFormatter(formatter)
+@click.group()
+@click.option("--profile", is_flag=False, flag_value="health-tracker.prof", default=None, metavar="[=PATH]",
+              help="Write a cProfile dump and collapsed stacks to PATH and print hot spots by phase")
+def cli(profile: str):
+    """Health Activity Tracker - Sync data from Garmin and Strava to Google Sheets"""
+    if profile:
+        start_profiling(profile)
+
 
-logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+@cli.result_callback()
+def report_api_calls(*args, **kwargs):
+    """Print the per-API-call summary and write the metrics dumps after every command"""
+    instrumentation = get_instrumentation()
+    command = click.get_current_context().invoked_subcommand or "cli"
 
+    lines = instrumentation.summary_lines()
+    if lines and config_get_bool('instrumentation.summary', True):
+        info("API calls:")
+        for line in lines:
+            print(f"  {line}")
 
-@click.group()
-def cli():
-    """Health Activity Tracker - Sync data from Garmin and Strava to Google Sheets"""
-    pass
+    try:
+        json_file = config_get_path('instrumentation.json_file', env_key='HEALTH_TRACKER_METRICS_JSON')
+        if json_file:
+            instrumentation.write_json(json_file, command)
+        prometheus_file = config_get_path('instrumentation.prometheus_file', env_key='HEALTH_TRACKER_METRICS_PROM')
+        if prometheus_file:
+            instrumentation.write_prometheus(prometheus_file, command)
+    except Exception as e:
+        error(f"Failed to write metrics: {e}")
 
 
 @cli.command("sync-health")
@@ -57,22 +77,29 @@ def cli():
 )
 @click.option("--start-date", help="Start date (YYYY-MM-DD)", default=date.today())
 @click.option("--end-date", help="End date (YYYY-MM-DD)", default=date.today())
-def sync_health(source: str, target: str, start_date: str, end_date: str):
+@click.option("--force", is_flag=True, help="Resync days the ledger marks as settled")
+@click.option("--no-wait", is_flag=True, help="Exit right away when the same sync is already running")
+def sync_health(source: str, target: str, start_date: str, end_date: str, force: bool, no_wait: bool):
     """📊 Sync health metrics (sleep, HRV, stress, etc.)"""
     service = SyncService()
+    service.lock_wait = service.lock_wait and not no_wait
     health_source = HealthSource.from_label(source)
     health_target = Target.from_label(target)
 
     info(f"Starting health sync from {health_source.label} to {health_target.label} ({start_date} → {end_date})")
 
     try:
-        service.sync_health(
+        result = service.sync_health(
             source=health_source,
             target=health_target,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            force=force
         )
-        success(f"Health sync from {health_source.label} to {health_target.label} completed successfully ✅")
+        if result.error:
+            error(f"Health sync from {health_source.label} to {health_target.label} did not run: {result.error}")
+        else:
+            success(f"Health sync from {health_source.label} to {health_target.label} completed successfully ✅")
     except Exception as e:
         error(f"Health sync failed: {e}")
 
@@ -106,25 +133,156 @@ def sync_health(source: str, target: str, start_date: str, end_date: str):
               required=True,
               help="End date for activities (format: YYYY-MM-DD HH:MM:SS)"
   )
-def sync_activities(source: str, target: str, start_date: str, end_date: str):
+@click.option("--no-wait", is_flag=True, help="Exit right away when the same sync is already running")
+def sync_activities(source: str, target: str, start_date: str, end_date: str, no_wait: bool):
     """🏃 Sync recent activities (runs, rides, workouts, …)"""
     service = SyncService()
+    service.lock_wait = service.lock_wait and not no_wait
     activities_source = ActivitiesSource.from_label(source)
     activities_target = Target.from_label(target)
 
     info(f"Starting activities sync from {activities_source.label} to {activities_target.label} (range: {start_date} to {end_date})")
     try:
-        service.sync_activities(
+        result = service.sync_activities(
             source=activities_source,
             target=activities_target,
             start_date=start_date,
             end_date=end_date
         )
-        success(f"Activities sync from {activities_source.label} to {activities_target.label} completed successfully ✅")
+        if result.error:
+            error(f"Activities sync from {activities_source.label} to {activities_target.label} "
+                  f"did not complete: {result.error}")
+        else:
+            success(f"Activities sync from {activities_source.label} to {activities_target.label} completed successfully ✅")
     except Exception as e:
         error(f"Activities sync failed: {e}")
 
 
+@cli.command("sync")
+@click.option("--health-source", type=click.Choice(HealthSource.choices(), case_sensitive=False),
+              default=HealthSource.GARMIN.label, show_default=True, help=HealthSource.help())
+@click.option("--activities-source", type=click.Choice(ActivitiesSource.choices(), case_sensitive=False),
+              default=ActivitiesSource.STRAVA.label, show_default=True, help=ActivitiesSource.help())
+@click.option("--target", type=click.Choice(Target.choices(), case_sensitive=False),
+              default=Target.from_label("sheets").label, show_default=True, help=Target.help())
+@click.option("--health-start-date", help="Health start date (YYYY-MM-DD)", default=date.today())
+@click.option("--health-end-date", help="Health end date (YYYY-MM-DD)", default=date.today())
+@click.option("--activities-start-date",
+              default=(datetime.today() - timedelta(hours=12, minutes=0)).strftime("%Y-%m-%d %H:%M:%S"),
+              show_default=True, help="Start date for activities (format: YYYY-MM-DD HH:MM:SS)")
+@click.option("--activities-end-date", default=datetime.today().strftime("%Y-%m-%d %H:%M:%S"),
+              show_default=True, help="End date for activities (format: YYYY-MM-DD HH:MM:SS)")
+@click.option("--force", is_flag=True, help="Resync days the ledger marks as settled")
+@click.option("--no-wait", is_flag=True, help="Exit right away when the same sync is already running")
+def sync(health_source: str, activities_source: str, target: str, health_start_date: str, health_end_date: str,
+         activities_start_date: str, activities_end_date: str, force: bool, no_wait: bool):
+    """🔄 Sync health metrics and activities concurrently to one target"""
+    service = SyncService()
+    service.lock_wait = service.lock_wait and not no_wait
+    sync_target = Target.from_label(target)
+
+    info(f"Starting health and activities sync to {sync_target.label}")
+    try:
+        results = service.sync_all(
+            health_source=HealthSource.from_label(health_source),
+            activities_source=ActivitiesSource.from_label(activities_source),
+            target=sync_target,
+            health_range=(str(health_start_date), str(health_end_date)),
+            activities_range=(activities_start_date, activities_end_date),
+            force=force
+        )
+    except Exception as e:
+        error(f"Sync failed: {e}")
+        return
+
+    for result in results:
+        if result.ok:
+            success(f"✓ {result.summary()}")
+        else:
+            error(f"✗ {result.summary()}")
+
+
+@cli.command("run-all")
+@click.option("--only", "profiles", multiple=True, help="Profile to run (repeatable, defaults to all profiles)")
+@click.option("--workers", type=int, default=None, help="Worker processes (defaults to run_all.workers or the CPU count)")
+@click.option("--health-start-date", help="Health start date (YYYY-MM-DD)", default=date.today())
+@click.option("--health-end-date", help="Health end date (YYYY-MM-DD)", default=date.today())
+@click.option("--activities-start-date",
+              default=(datetime.today() - timedelta(hours=12, minutes=0)).strftime("%Y-%m-%d %H:%M:%S"),
+              show_default=True, help="Start date for activities (format: YYYY-MM-DD HH:MM:SS)")
+@click.option("--activities-end-date", default=datetime.today().strftime("%Y-%m-%d %H:%M:%S"),
+              show_default=True, help="End date for activities (format: YYYY-MM-DD HH:MM:SS)")
+@click.option("--force", is_flag=True, help="Resync days the ledger marks as settled")
+def run_all(profiles: tuple, workers: int, health_start_date: str, health_end_date: str,
+            activities_start_date: str, activities_end_date: str, force: bool):
+    """👥 Run the combined sync for every athlete profile in parallel processes"""
+    from health_tracker.utils.config_loader import get_config
+    profiles = list(profiles) or list(get_config().profiles())
+    if not profiles:
+        error("No profiles configured, add them under profiles: in config/config.yaml")
+        return
+
+    started = time.perf_counter()
+    info(f"Running {len(profiles)} profiles: {', '.join(profiles)}")
+    try:
+        reports = ProfileRunner(workers).run(
+            profiles,
+            health_range=(str(health_start_date), str(health_end_date)),
+            activities_range=(activities_start_date, activities_end_date),
+            force=force
+        )
+    except Exception as e:
+        error(f"Run failed: {e}")
+        return
+
+    info("Report:")
+    for report in reports:
+        if report.error:
+            error(f"✗ {report.profile}: {report.error}")
+        for result in report.results:
+            if result.ok:
+                success(f"✓ {report.profile}: {result.summary()}")
+            else:
+                error(f"✗ {report.profile}: {result.summary()}")
+    synced = sum(r.synced for report in reports for r in report.results)
+    failed = sum(r.failed for report in reports for r in report.results)
+    ok = sum(report.ok for report in reports)
+    info(f"{ok}/{len(reports)} profiles ok, {synced} records synced, {failed} failed "
+         f"in {time.perf_counter() - started:.1f}s (profile time {sum(r.seconds for r in reports):.1f}s)")
+
+
+@cli.command("export")
+@click.option("--kind", type=click.Choice(["health", "activities"], case_sensitive=False), required=True,
+              help="Kind of records to export")
+@click.option("--format", "export_format", type=click.Choice(ExportFormat.choices(), case_sensitive=False),
+              default=ExportFormat.CSV.label, show_default=True, help=ExportFormat.help())
+@click.option("--source", default=None,
+              help=f"{HealthSource.help()}; {ActivitiesSource.help()} (defaults to the first one)")
+@click.option("--from", "start_date", required=True, help="Start date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)")
+@click.option("--to", "end_date", default=str(date.today()), show_default=True,
+              help="End date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)")
+@click.option("--output", "-o", default=None, help="Output file (defaults to <kind>_<from>_<to>.<format>)")
+def export(kind: str, export_format: str, source: str, start_date: str, end_date: str, output: str):
+    """💾 Export synced history to CSV or Parquet"""
+    fmt = ExportFormat.from_label(export_format)
+    output = output or f"{kind}_{start_date}_{end_date}.{fmt.label}".replace(" ", "_").replace(":", "")
+    exporter = Exporter()
+
+    info(f"Exporting {kind} ({start_date} → {end_date}) to {output}")
+    try:
+        if kind == "health":
+            health_source = HealthSource.from_label(source) if source else HealthSource.GARMIN
+            with fmt.writer(output, DayHealthData) as writer:
+                total = exporter.export_health(health_source, start_date, end_date, writer)
+        else:
+            activities_source = ActivitiesSource.from_label(source) if source else ActivitiesSource.STRAVA
+            with fmt.writer(output, ActivityData) as writer:
+                total = exporter.export_activities(activities_source, start_date, end_date, writer)
+        success(f"Exported {total} {kind} records to {output} ✅")
+    except Exception as e:
+        error(f"Export failed: {e}")
+
+
 @cli.command("setup-config")
 def setup_config():
     """🔧 Set up local configuration structure for customizing mappings"""
@@ -178,6 +336,7 @@ def config_info():
         print("\n  Logging:")
         print(f"    File path: {config.get('logging.file_path')}")
         print(f"    Level: {config.get('logging.level')}")
+        print(f"    Format: {config.get('logging.format')}")
         
         print("\n  Google Sheets:")
         print(f"    Credentials file: {config.get_path('google_sheets.credentials_file')}")
@@ -191,6 +350,7 @@ def config_info():
         
         print("\n  Garmin:")
         print(f"    Token directory: {config.get_path('garmin.token_dir')}")
+        print(f"    Processed activities file: {config.get_path('garmin.activities.processed_file')}")
         
         print("\n  Strava:")
         print(f"    Token file: {config.get_path('strava.token_file')}")
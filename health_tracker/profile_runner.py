@@ -0,0 +1,125 @@
+import logging
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from health_tracker.destination.destination import Target
+from health_tracker.provider.activities.activities_source import ActivitiesSource
+from health_tracker.provider.health.health_source import HealthSource
+from health_tracker.sync_service import SyncService
+from health_tracker.utils.config_loader import config_get_int, get_config
+from health_tracker.utils.instrumentation import get_instrumentation
+from health_tracker.utils.logging_config import setup_logging
+from health_tracker.utils.rate_limit import SharedTokenBucket, get_rate_limiter, service_limits
+
+QuotaKey = Tuple[str, str]
+
+_shared_buckets: Dict[QuotaKey, List[SharedTokenBucket]] = {}
+
+
+@dataclass
+class ProfileJob:
+    profile: str
+    health_range: Tuple[str, str]
+    activities_range: Tuple[str, str]
+    force: bool = False
+
+
+@dataclass
+class ProfileReport:
+    profile: str
+    results: list = field(default_factory=list)
+    calls: List[Dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and all(r.ok for r in self.results)
+
+
+class ProfileRunner:
+    """Runs the combined sync of every athlete profile, one isolated process per profile.
+
+    Profiles naming the same ``quota_groups`` entry for a service (e.g. one
+    Sheets service account) draw from shared token buckets across processes.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.logger = logging.getLogger("health-tracker")
+        self.workers = workers or config_get_int('run_all.workers') or os.cpu_count() or 1
+
+    def run(self, profiles: List[str], health_range: Tuple[str, str], activities_range: Tuple[str, str],
+            force: bool = False) -> List[ProfileReport]:
+        configured = get_config().profiles()
+        unknown = [p for p in profiles if p not in configured]
+        if unknown:
+            raise ValueError(f"Unknown profiles: {', '.join(unknown)}")
+
+        # spawn: every profile starts from clean config, client and cache state
+        context = multiprocessing.get_context("spawn")
+        shared = self._shared_buckets([configured[p] for p in profiles], context)
+        jobs = [ProfileJob(p, health_range, activities_range, force) for p in profiles]
+        workers = max(1, min(self.workers, len(jobs)))
+        self.logger.info(f"Running {len(jobs)} profiles on {workers} worker processes")
+
+        with context.Pool(workers, initializer=_init_worker, initargs=(shared,), maxtasksperchild=1) as pool:
+            reports = list(pool.imap_unordered(run_profile, jobs))
+
+        order = {p: i for i, p in enumerate(profiles)}
+        reports.sort(key=lambda r: order[r.profile])
+        for report in reports:
+            get_instrumentation().merge(report.calls)
+        return reports
+
+    @staticmethod
+    def _shared_buckets(profiles: List[Dict[str, Any]], context) -> Dict[QuotaKey, List[SharedTokenBucket]]:
+        shared: Dict[QuotaKey, List[SharedTokenBucket]] = {}
+        for profile in profiles:
+            for service, group in (profile.get('quota_groups') or {}).items():
+                if (service, group) not in shared:
+                    shared[(service, group)] = [
+                        SharedTokenBucket(l["requests"], l["per_seconds"], context) for l in service_limits(service)
+                    ]
+        return shared
+
+
+def _init_worker(shared: Dict[QuotaKey, List[SharedTokenBucket]]) -> None:
+    global _shared_buckets
+    _shared_buckets = shared
+    setup_logging()
+
+
+def run_profile(job: ProfileJob) -> ProfileReport:
+    """Worker entry point: sync one profile with its config overlay, env file and shared quotas"""
+    started = time.perf_counter()
+    report = ProfileReport(job.profile)
+    try:
+        config = get_config()
+        profile = config.use_profile(job.profile)
+        if profile.get('env_file'):
+            load_dotenv(config.get_path('env_file'), override=True)
+        limiter = get_rate_limiter()
+        for service, group in (profile.get('quota_groups') or {}).items():
+            limiter.use_buckets(service, _shared_buckets[(service, group)])
+
+        report.results = SyncService().sync_all(
+            health_source=HealthSource.from_label(profile.get('health_source', HealthSource.GARMIN.label)),
+            activities_source=ActivitiesSource.from_label(profile.get('activities_source',
+                                                                      ActivitiesSource.STRAVA.label)),
+            target=Target.from_label(profile.get('target', 'sheets')),
+            health_range=job.health_range,
+            activities_range=job.activities_range,
+            force=job.force,
+        )
+    except Exception as e:
+        logging.getLogger("health-tracker").error(f"Profile {job.profile} failed: {e}")
+        report.error = str(e)
+    report.calls = get_instrumentation().snapshot()
+    report.seconds = time.perf_counter() - started
+    return report
+
@@ -1,17 +1,38 @@
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
 from health_tracker.data.activity_data import ActivityData
 from health_tracker.destination.destination import Target
 
 
 class ActivitiesProvider(ABC):
-    def __init__(self, target: Target):
+    def __init__(self, target: Optional[Target] = None):
         self.target = target
 
+    def require_fields(self, fields: Iterable[str]) -> None:
+        """ActivityData fields the destination actually uses; providers may skip fetching the rest"""
+
     @abstractmethod
     def fetch_activities_by_date_range(self, start_date: str, end_date: str) -> List[ActivityData]:
         pass
 
+    @abstractmethod
+    def iter_activities_by_date_range(self, start_date: str, end_date: str,
+                                      skip_processed: bool = False) -> Iterator[ActivityData]:
+        pass
+
     @abstractmethod
     def mark_as_processed(self, ids: set) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    def _parse_range(self, start_date: str, end_date: str) -> Tuple[datetime, datetime]:
+        try:
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        except ValueError:
+            try:
+                start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+                end_dt = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                raise ValueError("Date format must be 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DD'")
+        return start_dt, end_dt
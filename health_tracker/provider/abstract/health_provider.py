@@ -1,8 +1,30 @@
 from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from typing import Iterable, List
+
 from health_tracker.data.day_health_data import DayHealthData
 
 
 class HealthProvider(ABC):
+    # Longest window get_data_for_range can serve efficiently; 1 means per-day only
+    max_range_days: int = 1
+
+    def require_fields(self, fields: Iterable[str]) -> None:
+        """DayHealthData fields the destination actually uses; providers may skip fetching the rest"""
+
+    def provided_fields(self) -> List[str]:
+        """DayHealthData fields the provider fetches from the source (not ``date`` or derived fields)"""
+        return []
+
     @abstractmethod
     def get_data_for_date(self, date: str) -> DayHealthData:
         pass
+
+    def get_data_for_range(self, start_date: str, end_date: str) -> List[DayHealthData]:
+        """Data for every day from start_date to end_date inclusive; per-day calls unless overridden"""
+        return [self.get_data_for_date(d) for d in days_between(start_date, end_date)]
+
+
+def days_between(start_date: str, end_date: str) -> List[str]:
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
@@ -1,12 +1,17 @@
 from enum import Enum
+from typing import Optional
 
 from health_tracker.destination.destination import Target
 from health_tracker.provider.abstract.activities_provider import ActivitiesProvider
+from health_tracker.provider.activities.file_import import FileActivitiesProvider
+from health_tracker.provider.activities.garmin import GarminActivitiesProvider
 from health_tracker.provider.activities.strava import StravaActivitiesProvider
 
 
 class ActivitiesSource(Enum):
     STRAVA = ("strava", StravaActivitiesProvider)
+    FILES = ("files", FileActivitiesProvider)
+    GARMIN = ("garmin", GarminActivitiesProvider)
 
     def __init__(self, label: str, provider_cls):
         self._label = label
@@ -16,7 +21,7 @@ class ActivitiesSource(Enum):
     def label(self) -> str:
         return self._label
 
-    def provider(self, target: Target) -> ActivitiesProvider:
+    def provider(self, target: Optional[Target] = None) -> ActivitiesProvider:
         return self._provider_cls(target)
 
     @classmethod
@@ -0,0 +1,337 @@
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+from health_tracker.analytics.stream_metrics import (
+    StreamMetrics, elevation_gain, normalized_power, sample_durations,
+)
+from health_tracker.data.activity_data import ActivityData
+from health_tracker.destination.destination import Target
+from health_tracker.provider.abstract.activities_provider import ActivitiesProvider
+from health_tracker.provider.activities.processed_ids import add_processed_ids, load_processed_ids
+from health_tracker.utils.config_loader import config_get_int, config_get_path
+
+SUPPORTED_SUFFIXES = (".fit", ".gpx", ".tcx")
+SPORT_TYPES = {
+    "cycling": "Ride", "biking": "Ride", "road_biking": "Ride", "mountain_biking": "MountainBikeRide",
+    "running": "Run", "walking": "Walk", "hiking": "Hike", "swimming": "Swim",
+}
+EARTH_RADIUS_M = 6371008.8
+SEMICIRCLES_TO_DEGREES = 180 / 2 ** 31
+
+# (cache key, source path, archive member or None)
+ActivityFile = Tuple[str, str, Optional[str]]
+
+
+class FileActivitiesProvider(ActivitiesProvider):
+    """Imports FIT, GPX and TCX files (optionally gzipped) from a directory or a
+    Strava bulk-export ZIP, without any API calls.
+
+    Files are parsed on a process pool and summarised from their record streams
+    with NumPy. Results are cached by file hash, so re-running an import only
+    parses files that were added since.
+    """
+
+    def __init__(self, target: Optional[Target] = None, path: Optional[Path] = None):
+        self.logger = logging.getLogger("health-tracker")
+        self.path = path or config_get_path('activity_import.path', env_key='ACTIVITY_IMPORT_PATH')
+        if not self.path or not self.path.exists():
+            raise ValueError("Missing activity import path. Set ACTIVITY_IMPORT_PATH env var or configure in config.yaml")
+
+        self.workers = config_get_int('activity_import.workers') or os.cpu_count() or 1
+        self.cache_file = config_get_path('activity_import.cache_file', 'activity_import_cache.json')
+        self.PROCESSED_FILE = config_get_path('activity_import.processed_file', 'imported_activities.json')
+        super().__init__(target)
+
+    def fetch_activities_by_date_range(self, start_date: str, end_date: str) -> List[ActivityData]:
+        return list(self.iter_activities_by_date_range(start_date, end_date, skip_processed=True))
+
+    def iter_activities_by_date_range(self, start_date: str, end_date: str,
+                                      skip_processed: bool = False) -> Iterator[ActivityData]:
+        start_dt, end_dt = self._parse_range(start_date, end_date)
+        processed_ids = self._load_processed_ids() if skip_processed else set()
+        files = self._list_files()
+        cache = self._load_cache()
+        misses = [f for f in files if f[0] not in cache]
+        self.logger.info(f"Importing {len(files)} activity files from {self.path} ({len(misses)} not cached)")
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if misses else None
+        futures: Dict[str, Future] = {
+            key: executor.submit(parse_activity_file, source, member) for key, source, member in misses
+        }
+        try:
+            seen = set()
+            for key, source, member in files:
+                if key in seen:
+                    continue
+                seen.add(key)
+                if key in futures:
+                    try:
+                        cache[key] = futures.pop(key).result()
+                    except Exception as e:
+                        # Not cached: the file is parsed again once the cause (e.g. a missing extra) is fixed
+                        self.logger.warning(f"Could not parse {member or source}: {e}")
+                        continue
+                fields = cache[key]
+                if not fields or fields["id"] in processed_ids:
+                    continue
+                activity = ActivityData(**{**fields, "date": datetime.fromisoformat(fields["date"])})
+                if start_dt <= activity.date <= end_dt:
+                    yield activity
+        finally:
+            if executor:
+                for future in futures.values():
+                    future.cancel()
+                executor.shutdown()
+                self._save_cache(cache)
+
+    def mark_as_processed(self, ids: set):
+        add_processed_ids(self.PROCESSED_FILE, self.target.label, ids)
+
+    def _load_processed_ids(self) -> set:
+        return load_processed_ids(self.PROCESSED_FILE, self.target.label)
+
+    def _list_files(self) -> List[ActivityFile]:
+        if self.path.is_dir():
+            return [
+                (_file_hash(p), str(p), None)
+                for p in sorted(self.path.rglob("*")) if p.is_file() and _is_supported(p.name)
+            ]
+        with zipfile.ZipFile(self.path) as archive:
+            # The archive already stores a CRC32 of every member, no need to decompress to hash it
+            return [
+                (f"{info.CRC:08x}-{info.file_size}", str(self.path), info.filename)
+                for info in sorted(archive.infolist(), key=lambda i: i.filename)
+                if not info.is_dir() and _is_supported(info.filename)
+            ]
+
+    def _load_cache(self) -> Dict[str, Optional[dict]]:
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self, cache: Dict[str, Optional[dict]]) -> None:
+        tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, self.cache_file)
+
+
+def parse_activity_file(source: str, member: Optional[str]) -> Optional[dict]:
+    """Process pool entry point: ActivityData fields (date as ISO string) for one file"""
+    name = member or source
+    if member:
+        raw = _open_archive(source).read(member)
+    else:
+        raw = Path(source).read_bytes()
+    if name.lower().endswith(".gz"):
+        raw = gzip.decompress(raw)
+        name = name[:-3]
+
+    suffix = Path(name).suffix.lower()
+    if suffix == ".fit":
+        meta, streams = _read_fit(raw)
+    else:
+        meta, streams = _read_xml(raw, "trkpt" if suffix == ".gpx" else "Trackpoint")
+    if "time" not in streams or len(streams["time"]) < 2:
+        return None
+    return _summarize(Path(name).name.split(".")[0], meta, streams)
+
+
+def _summarize(activity_id: str, meta: dict, streams: Dict[str, np.ndarray]) -> dict:
+    times = streams.pop("time")
+    time = (times - times[0]) / np.timedelta64(1, "s")
+    durations = sample_durations(time)
+    moving = float(durations.sum())
+
+    distance = _distance(streams)
+    hr = streams.get("heartrate")
+    watts = streams.get("watts")
+    altitude = streams.get("altitude")
+
+    fields = {
+        "id": activity_id,
+        "date": pd.Timestamp(times[0]).tz_localize("UTC").isoformat(),
+        "sport_type": SPORT_TYPES.get(str(meta.get("sport", "")).lower(), str(meta.get("sport") or "Workout").title()),
+        "duration_seconds": int(moving),
+        "distance": distance,
+        "avg_speed": round(distance / moving, 2) if distance and moving else None,
+        "avg_hr": _weighted_mean(hr, durations, digits=0),
+        "max_hr": _nanmax(hr),
+        "calories": meta.get("calories"),
+        "avg_watt": _weighted_mean(watts, durations, digits=0),
+        "max_watt": _nanmax(watts),
+        "normalized_power": _round(normalized_power(time, watts), 0) if watts is not None else None,
+        "elevation": _round(elevation_gain(altitude), 0) if altitude is not None else None,
+        "url": None,
+    }
+    fields.update(StreamMetrics().compute({
+        "time": time, "heartrate": hr, "watts": watts, "velocity_smooth": streams.get("speed"),
+    }))
+    return fields
+
+
+def _distance(streams: Dict[str, np.ndarray]) -> Optional[float]:
+    if "distance" in streams and not np.all(np.isnan(streams["distance"])):
+        return round(float(np.nanmax(streams["distance"])), 1)
+    if "lat" not in streams or "lon" not in streams:
+        return None
+    lat, lon = np.radians(streams["lat"]), np.radians(streams["lon"])
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    lat, lon = lat[valid], lon[valid]
+    if len(lat) < 2:
+        return None
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2
+    return round(float((2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))).sum()), 1)
+
+
+def _weighted_mean(values: Optional[np.ndarray], durations: np.ndarray, digits: int) -> Optional[float]:
+    if values is None:
+        return None
+    valid = ~np.isnan(values)
+    if durations[valid].sum() <= 0:
+        return None
+    return _round(np.average(values[valid], weights=durations[valid]), digits)
+
+
+def _nanmax(values: Optional[np.ndarray]) -> Optional[float]:
+    if values is None or np.all(np.isnan(values)):
+        return None
+    return float(np.nanmax(values))
+
+
+def _round(value: Optional[float], digits: int) -> Optional[float]:
+    return None if value is None else round(float(value), digits)
+
+
+def _read_xml(raw: bytes, point_tag: str) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """GPX/TCX track points as streams; namespaces are ignored so GPX extensions
+    (heart rate, power) and TCX extensions (watts, speed) are picked up alike"""
+    columns = {
+        "time": ("time", "Time"), "lat": ("lat", "LatitudeDegrees"), "lon": ("lon", "LongitudeDegrees"),
+        "altitude": ("ele", "AltitudeMeters"), "distance": ("DistanceMeters",),
+        "heartrate": ("hr", "Value"), "watts": ("power", "Watts", "PowerInWatts"), "speed": ("Speed",),
+    }
+    points: List[dict] = []
+    meta: dict = {}
+    calories = 0
+    depth = 0
+
+    for event, elem in ElementTree.iterparse(io.BytesIO(raw), events=("start", "end")):
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            if tag == point_tag:
+                depth += 1
+            elif tag == "Activity" and "Sport" in elem.attrib:
+                meta["sport"] = elem.attrib["Sport"]
+            continue
+
+        if tag == point_tag:
+            depth -= 1
+            point = dict(elem.attrib)
+            for child in elem.iter():
+                if child is not elem and child.text and child.text.strip():
+                    point[child.tag.rsplit("}", 1)[-1]] = child.text.strip()
+            points.append(point)
+            elem.clear()
+        elif depth == 0 and tag == "type" and elem.text:
+            meta["sport"] = elem.text.strip()
+        elif depth == 0 and tag == "Calories" and elem.text:
+            calories += int(float(elem.text))
+
+    if calories:
+        meta["calories"] = calories
+    frame = pd.DataFrame(points)
+    streams: Dict[str, np.ndarray] = {}
+    for name, keys in columns.items():
+        key = next((k for k in keys if k in frame.columns), None)
+        if key is None:
+            continue
+        if name == "time":
+            streams[name] = pd.to_datetime(frame[key], utc=True).dt.tz_localize(None).to_numpy()
+        else:
+            streams[name] = pd.to_numeric(frame[key], errors="coerce").to_numpy(dtype=np.float64)
+    return meta, _drop_untimed(streams)
+
+
+def _read_fit(raw: bytes) -> Tuple[dict, Dict[str, np.ndarray]]:
+    try:
+        import fitdecode
+    except ImportError:
+        raise RuntimeError("FIT import requires fitdecode. Install it with: pip install 'health-activity-tracker[fit]'")
+
+    fields = {
+        "time": ("timestamp",), "lat": ("position_lat",), "lon": ("position_long",),
+        "altitude": ("enhanced_altitude", "altitude"), "distance": ("distance",),
+        "heartrate": ("heart_rate",), "watts": ("power",), "speed": ("enhanced_speed", "speed"),
+    }
+    records: Dict[str, list] = {name: [] for name in fields}
+    meta: dict = {}
+
+    with fitdecode.FitReader(io.BytesIO(raw)) as fit:
+        for frame in fit:
+            if frame.frame_type != fitdecode.FIT_FRAME_DATA:
+                continue
+            if frame.name == "record":
+                for name, keys in fields.items():
+                    value = next((frame.get_value(k) for k in keys if frame.has_field(k)), None)
+                    records[name].append(value)
+            elif frame.name == "session":
+                meta.setdefault("sport", frame.get_value("sport", fallback=None))
+                meta.setdefault("calories", frame.get_value("total_calories", fallback=None))
+
+    streams: Dict[str, np.ndarray] = {}
+    for name, values in records.items():
+        if not any(v is not None for v in values):
+            continue
+        if name == "time":
+            streams[name] = pd.to_datetime(values, utc=True).tz_localize(None).to_numpy()
+        else:
+            streams[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    for name in ("lat", "lon"):
+        if name in streams:
+            streams[name] = streams[name] * SEMICIRCLES_TO_DEGREES
+    return meta, _drop_untimed(streams)
+
+
+def _drop_untimed(streams: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    if "time" not in streams:
+        return streams
+    valid = ~pd.isna(streams["time"])
+    order = np.argsort(streams["time"][valid], kind="stable")
+    return {name: values[valid][order] for name, values in streams.items()}
+
+
+def _is_supported(name: str) -> bool:
+    name = name.lower()
+    name = name[:-3] if name.endswith(".gz") else name
+    return name.endswith(SUPPORTED_SUFFIXES)
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _open_archive(path: str) -> zipfile.ZipFile:
+    """One open handle per worker process for the archive being imported"""
+    return zipfile.ZipFile(path)
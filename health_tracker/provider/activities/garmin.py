@@ -0,0 +1,129 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+import garminconnect
+
+from health_tracker.data.activity_data import ActivityData
+from health_tracker.destination.destination import Target
+from health_tracker.provider.abstract.activities_provider import ActivitiesProvider
+from health_tracker.provider.activities.file_import import SPORT_TYPES
+from health_tracker.provider.activities.processed_ids import add_processed_ids, load_processed_ids
+from health_tracker.provider.health.health_source import HealthSource
+from health_tracker.utils.config_loader import config_get_int, config_get_path
+from health_tracker.utils.instrumentation import api_call
+
+ACTIVITIES_URL = "/activitylist-service/activities/search/activities"
+# Garmin Connect caps the activity list page size
+MAX_PAGE_SIZE = 1000
+GARMIN_SPORT_TYPES = {
+    **SPORT_TYPES,
+    "gravel_cycling": "GravelRide", "indoor_cycling": "Ride", "virtual_ride": "VirtualRide",
+    "trail_running": "TrailRun", "treadmill_running": "Run", "lap_swimming": "Swim",
+    "open_water_swimming": "Swim", "strength_training": "WeightTraining", "yoga": "Yoga",
+}
+
+
+# ActivityData field -> key of the activity list entry.
+# Zones are Garmin's own, as configured on the watch, not stream_metrics' zones
+FIELDS: Dict[str, str] = {
+    "distance": "distance",
+    "avg_speed": "averageSpeed",
+    "avg_hr": "averageHR",
+    "max_hr": "maxHR",
+    "calories": "calories",
+    "avg_watt": "avgPower",
+    "max_watt": "maxPower",
+    "normalized_power": "normPower",
+    "elevation": "elevationGain",
+    **{f"hr_zone_{zone}_seconds": f"hrTimeInZone_{zone}" for zone in range(1, 6)},
+    **{f"power_zone_{zone}_seconds": f"powerTimeInZone_{zone}" for zone in range(1, 8)},
+    "best_power_5s": "maxAvgPower_5",
+    "best_power_1m": "maxAvgPower_60",
+    "best_power_5m": "maxAvgPower_300",
+    "best_power_20m": "maxAvgPower_1200",
+}
+
+
+class GarminActivitiesProvider(ActivitiesProvider):
+    """Activities from Garmin Connect's paginated activity list.
+
+    List entries already carry the summary metrics, so a sync costs one call
+    per ``garmin.activities.page_size`` activities and every field is filled.
+    """
+
+    def __init__(self, target: Optional[Target] = None, garmin: Optional[garminconnect.Garmin] = None):
+        self.logger = logging.getLogger("health-tracker")
+        # Shares the logged-in session with the Garmin health source
+        self.garmin = garmin or HealthSource.GARMIN.provider.garmin
+        self.page_size = min(config_get_int('garmin.activities.page_size', 100), MAX_PAGE_SIZE)
+        self.PROCESSED_FILE = config_get_path('garmin.activities.processed_file', 'garmin_processed_activities.json')
+        super().__init__(target)
+
+    def fetch_activities_by_date_range(self, start_date: str, end_date: str) -> List[ActivityData]:
+        return list(self.iter_activities_by_date_range(start_date, end_date, skip_processed=True))
+
+    def iter_activities_by_date_range(self, start_date: str, end_date: str,
+                                      skip_processed: bool = False) -> Iterator[ActivityData]:
+        start_dt, end_dt = self._parse_range(start_date, end_date)
+        self.logger.info(f"Fetching Garmin activities from {start_dt.isoformat()} to {end_dt.isoformat()}")
+
+        processed_ids = self._load_processed_ids() if skip_processed else set()
+        for entry in self._list_activities(start_dt, end_dt):
+            started = self._start_time(entry)
+            if started is None or not start_dt <= started <= end_dt or str(entry["activityId"]) in processed_ids:
+                continue
+            yield self._convert_to_internal(entry, started)
+
+    def _list_activities(self, start_dt: datetime, end_dt: datetime) -> Iterator[dict]:
+        # The list filters on local calendar days; a day either side covers any
+        # timezone and the exact bounds are checked against startTimeGMT
+        params = {
+            "startDate": (start_dt - timedelta(days=1)).strftime("%Y-%m-%d"),
+            "endDate": (end_dt + timedelta(days=1)).strftime("%Y-%m-%d"),
+            "limit": str(self.page_size),
+        }
+        start = 0
+        while True:
+            page = api_call("garmin", "activities/search", self.garmin.connectapi, ACTIVITIES_URL,
+                            params={**params, "start": str(start)}) or []
+            yield from page
+            if len(page) < self.page_size:
+                return
+            start += self.page_size
+
+    @staticmethod
+    def _start_time(entry: dict) -> Optional[datetime]:
+        try:
+            return datetime.strptime(entry["startTimeGMT"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _convert_to_internal(self, entry: dict, started: datetime) -> ActivityData:
+        activity_id = entry["activityId"]
+        type_key = str((entry.get("activityType") or {}).get("typeKey") or "")
+        data = ActivityData(
+            id=str(activity_id),
+            date=started,
+            sport_type=GARMIN_SPORT_TYPES.get(type_key, type_key.replace("_", " ").title() or "Workout"),
+            duration_seconds=int(entry.get("movingDuration") or entry.get("duration") or 0),
+            distance=None,
+            avg_speed=None,
+            avg_hr=None,
+            max_hr=None,
+            calories=None,
+            avg_watt=None,
+            max_watt=None,
+            normalized_power=None,
+            elevation=None,
+            url=f"https://connect.garmin.com/modern/activity/{activity_id}",
+        )
+        for field, key in FIELDS.items():
+            setattr(data, field, entry.get(key))
+        return data
+
+    def mark_as_processed(self, ids: set):
+        add_processed_ids(self.PROCESSED_FILE, self.target.label, ids)
+
+    def _load_processed_ids(self) -> set:
+        return load_processed_ids(self.PROCESSED_FILE, self.target.label)
@@ -0,0 +1,28 @@
+import json
+from pathlib import Path
+from typing import Iterable, Set
+
+
+def load_processed_ids(path: Path, label: str) -> Set[str]:
+    """Activity ids already synced to the target with the given label"""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+            return set(data.get(label, []))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+
+
+def add_processed_ids(path: Path, label: str, ids: Iterable[str]) -> None:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+
+    existing = set(data.get(label, []))
+    existing.update(ids)
+    data[label] = list(existing)
+
+    with open(path, "w") as f:
+        json.dump(data, f)
@@ -1,21 +1,36 @@
 import json
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
 from stravalib import Client
 from stravalib.model import SummaryActivity
 
+from health_tracker.analytics.stream_metrics import StreamMetrics
 from health_tracker.data.activity_data import ActivityData
 from health_tracker.destination.destination import Target
 from health_tracker.provider.abstract.activities_provider import ActivitiesProvider
-from health_tracker.utils.config_loader import config_get_path
+from health_tracker.provider.activities.processed_ids import add_processed_ids, load_processed_ids
+from health_tracker.utils.config_loader import config_get_bool, config_get_path
+from health_tracker.utils.instrumentation import api_call
+from health_tracker.utils.rate_limit import get_rate_limiter
+from health_tracker.utils.transport import new_session
+
+STREAM_TYPES = ["time", "heartrate", "watts", "velocity_smooth"]
 
 
 class StravaActivitiesProvider(ActivitiesProvider):
-    def __init__(self, target: Target):
+    def __init__(self, target: Optional[Target] = None, client: Optional[Client] = None):
         self.logger = logging.getLogger("health-tracker")
-        self.client, self.token_data = self._setup_client()
+        if client is None:
+            self.client, self.token_data = self._setup_client()
+        else:
+            self.client, self.token_data = client, {}
         self.PROCESSED_FILE = config_get_path('strava.processed_file', 'processed_activities.json')
+        self.streams_enabled = config_get_bool('strava.streams.enabled', False)
+        self.streams_cache_dir = config_get_path('strava.streams.cache_dir', 'strava_streams')
+        self.stream_metrics = StreamMetrics() if self.streams_enabled else None
         super().__init__(target)
 
     def _setup_client(self):
@@ -30,42 +45,34 @@ class StravaActivitiesProvider(ActivitiesProvider):
             access_token=token_data["access_token"],
             refresh_token=token_data["refresh_token"],
             token_expires=token_data["expires_at"],
+            rate_limiter=get_rate_limiter().update_strava_usage,
+            requests_session=new_session(),
         )
         return client, token_data
 
     def fetch_activities_by_date_range(self, start_date: str, end_date: str) -> List[ActivityData]:
         """Fetch activities within a specific date range"""
-        try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
-        except ValueError:
-            try:
-                start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-                end_dt = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-            except ValueError:
-                raise ValueError("Date format must be 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DD'")
+        return list(self.iter_activities_by_date_range(start_date, end_date, skip_processed=True))
 
+    def iter_activities_by_date_range(self, start_date: str, end_date: str,
+                                      skip_processed: bool = False) -> Iterator[ActivityData]:
+        """Lazily yield activities within a date range, fetching details one activity at a time"""
+        start_dt, end_dt = self._parse_range(start_date, end_date)
         self.logger.info(f"Fetching activities from {start_dt.isoformat()} to {end_dt.isoformat()}")
 
-        summaries_iter = self.client.get_activities(after=start_dt, before=end_dt)
-
-        activities_in_range: List[SummaryActivity] = []
-        for s in summaries_iter:
-            if start_dt <= s.start_date <= end_dt:
-                activities_in_range.append(s)
-
-        processed_ids = self._load_processed_ids()
-        new_activities = [s for s in activities_in_range if s.id not in processed_ids]
-
-        activities = [self._convert_to_internal(s) for s in new_activities]
-
-        return activities
-
+        processed_ids = self._load_processed_ids() if skip_processed else set()
+        # Summaries are small, list them eagerly so the paging calls are timed; details stay lazy
+        summaries: List[SummaryActivity] = api_call(
+            "strava", "get_activities", lambda: list(self.client.get_activities(after=start_dt, before=end_dt))
+        )
+        for s in summaries:
+            if start_dt <= s.start_date <= end_dt and s.id not in processed_ids:
+                yield self._convert_to_internal(s)
 
     def _convert_to_internal(self, summary: SummaryActivity) -> ActivityData:
-        activity = self.client.get_activity(activity_id=summary.id)
+        activity = api_call("strava", "get_activity", self.client.get_activity, activity_id=summary.id)
 
-        return ActivityData(
+        data = ActivityData(
             id=str(activity.id),
             date=activity.start_date,
             sport_type=activity.sport_type.root,
@@ -81,37 +88,41 @@ class StravaActivitiesProvider(ActivitiesProvider):
             elevation=activity.total_elevation_gain,
             url=f"https://strava.com/activities/{activity.id}"
         )
-
-    def mark_as_processed(self, ids: set):
+        if self.stream_metrics:
+            for field, value in self.stream_metrics.compute(self._get_streams(activity.id)).items():
+                setattr(data, field, value)
+        return data
+
+    def _get_streams(self, activity_id: int) -> Dict[str, np.ndarray]:
+        """Activity streams as arrays, served from the compressed on-disk cache when present"""
+        cache_file = self.streams_cache_dir / f"{activity_id}.npz"
         try:
-            with open(self.PROCESSED_FILE, "r") as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {}
-
-        existing = set(data.get(self.target.label, []))
-        existing.update(ids)
-        data[self.target.label] = list(existing)
+            with np.load(cache_file) as cached:
+                return {name: cached[name] for name in cached.files}
+        except (FileNotFoundError, ValueError, OSError):
+            pass
 
-        with open(self.PROCESSED_FILE, "w") as f:
-            json.dump(data, f)
-
-    def _load_processed_ids(self) -> set:
         try:
-            with open(self.PROCESSED_FILE, "r") as f:
-                data = json.load(f)
-                return set(data.get(self.target.label, []))
-        except (FileNotFoundError, json.JSONDecodeError):
-            return set()
+            raw = api_call("strava", "get_activity_streams", self.client.get_activity_streams,
+                           activity_id, types=STREAM_TYPES)
+        except Exception as e:
+            self.logger.warning(f"Could not fetch streams for activity {activity_id}: {e}")
+            return {}
+
+        streams = {
+            name: np.asarray(stream.data, dtype=np.float64)
+            for name, stream in (raw or {}).items()
+            if name in STREAM_TYPES and stream.data
+        }
+        # Streams of a finished activity never change, so they are cached for good
+        self.streams_cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(cache_file.name + ".tmp.npz")
+        np.savez_compressed(tmp_file, **streams)
+        tmp_file.replace(cache_file)
+        return streams
 
-    def _save_processed_ids(self, ids: set):
-        try:
-            with open(self.PROCESSED_FILE, "r") as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {}
-
-        data[self.target.label] = list(ids)
+    def mark_as_processed(self, ids: set):
+        add_processed_ids(self.PROCESSED_FILE, self.target.label, ids)
 
-        with open(self.PROCESSED_FILE, "w") as f:
-            json.dump(data, f)
+    def _load_processed_ids(self) -> set:
+        return load_processed_ids(self.PROCESSED_FILE, self.target.label)
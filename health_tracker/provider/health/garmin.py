@@ -2,16 +2,140 @@ import logging
 import os
 import garth
 import garminconnect
-from typing import Optional, Union
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 from health_tracker.data.day_health_data import DayHealthData
-from health_tracker.provider.abstract.health_provider import HealthProvider
-from health_tracker.utils.config_loader import config_get_path
+from health_tracker.provider.abstract.health_provider import HealthProvider, days_between
+from health_tracker.utils.config_loader import config_get_bool, config_get_path
+from health_tracker.utils.instrumentation import api_call
+from health_tracker.utils.transport import configure_garmin
 
 
-class GarminHealthProvider(HealthProvider):
-    def __init__(self):
+# Garmin Connect rejects range requests spanning more than 28 days
+RANGE_DAYS = 28
+STRESS_RANGE_URL = "/usersummary-service/stats/stress/daily"
+MAX_METRICS_RANGE_URL = "/metrics-service/metrics/maxmet/daily"
+
+
+@dataclass(frozen=True)
+class GarminMetric:
+    """Where a DayHealthData field comes from.
+
+    ``payload`` is the per-day response the field is read from ("stats",
+    "sleep", "max_metrics" or "ftp"), ``extract`` reads it (called with the
+    mapping instance and that payload) and ``range_endpoints`` are the calls
+    get_data_for_range needs for it.
+    """
+    payload: str
+    extract: Callable[["GarminDayMapping", Any], Any]
+    range_endpoints: Tuple[str, ...]
+
+
+def _sleep_dto(sleep_data: Optional[dict]) -> dict:
+    return (sleep_data or {}).get("dailySleepDTO") or {}
+
+
+def _non_negative(value):
+    return value if value is not None and value >= 0 else None
+
+
+# Adding a Garmin metric is one entry here plus the DayHealthData field
+METRICS: Dict[str, GarminMetric] = {
+    "sleep_hours": GarminMetric(
+        "sleep", lambda m, p: m._secs_to_hours(_sleep_dto(p).get("sleepTimeSeconds")), ("sleep",)),
+    "sleep_score": GarminMetric(
+        "sleep", lambda m, p: m._safe_round(_sleep_dto(p).get("sleepScores", {}).get("overall", {}).get("value")),
+        ("sleep",)),
+    "sleep_deep_hours": GarminMetric(
+        "sleep", lambda m, p: m._secs_to_hours(_sleep_dto(p).get("deepSleepSeconds")), ("sleep",)),
+    "sleep_rem_hours": GarminMetric(
+        "sleep", lambda m, p: m._secs_to_hours(_sleep_dto(p).get("remSleepSeconds")), ("sleep",)),
+    "sleep_awake_minutes": GarminMetric(
+        "sleep", lambda m, p: m._secs_to_minutes(_sleep_dto(p).get("awakeSleepSeconds")), ("sleep",)),
+    "sleep_awake_count": GarminMetric(
+        "sleep", lambda m, p: _sleep_dto(p).get("awakeCount"), ("sleep",)),
+    "average_sleep_stress": GarminMetric(
+        "sleep", lambda m, p: m._safe_round(_sleep_dto(p).get("avgSleepStress")), ("sleep",)),
+    "sleep_needed_hours": GarminMetric(
+        "sleep", lambda m, p: m._secs_to_minutes(_sleep_dto(p).get("sleepNeed", {}).get("actual")), ("sleep",)),
+    "average_spo2_value": GarminMetric(
+        "sleep", lambda m, p: m._safe_round(_sleep_dto(p).get("averageSpO2Value")), ("sleep",)),
+    "average_overnight_hrv": GarminMetric(
+        "sleep", lambda m, p: m._safe_round((p or {}).get("avgOvernightHrv")), ("sleep",)),
+    "resting_heart_rate": GarminMetric(
+        "sleep", lambda m, p: (p or {}).get("restingHeartRate"), ("sleep",)),
+    "average_stress_level": GarminMetric(
+        "stats", lambda m, p: _non_negative((p or {}).get("averageStressLevel")), ("stress",)),
+    "stress_hours": GarminMetric(
+        "stats", lambda m, p: m._secs_to_hours((p or {}).get("stressDuration")), ("stress",)),
+    "weight": GarminMetric(
+        "stats", lambda m, p: m._safe_round((p or {}).get("weight"), 1000), ("body_composition",)),
+    "body_battery": GarminMetric(
+        "stats", lambda m, p: (p or {}).get("bodyBatteryAtWakeTime"), ("body_battery", "sleep")),
+    "run_vo2max": GarminMetric(
+        "max_metrics", lambda m, p: m._safe_round(m._safe_get_vo2max(p, "generic")), ("max_metrics",)),
+    "bike_vo2max": GarminMetric(
+        "max_metrics", lambda m, p: m._safe_round(m._safe_get_vo2max(p, "cycling")), ("max_metrics",)),
+    "bike_ftp": GarminMetric("ftp", lambda m, p: p, ("ftp",)),
+    "total_steps": GarminMetric("stats", lambda m, p: (p or {}).get("totalSteps"), ("steps",)),
+}
+
+
+class GarminDayMapping:
+    """Builds DayHealthData from Garmin Connect shaped stats, sleep and max metrics payloads"""
+
+    def provided_fields(self) -> List[str]:
+        return list(METRICS)
+
+    def _to_day_health_data(self, date: str, payloads: Dict[str, Any],
+                            fields: Optional[Iterable[str]] = None) -> DayHealthData:
+        """``payloads`` by GarminMetric.payload; fields outside ``fields`` (default all) stay None"""
+        fields = METRICS.keys() if fields is None else fields
+        return DayHealthData(date=date, **{
+            field: metric.extract(self, payloads.get(metric.payload)) if field in fields else None
+            for field, metric in METRICS.items()
+        })
+
+    def _safe_get_vo2max(self, max_metrics, category) -> Optional[float]:
+        if not max_metrics or not isinstance(max_metrics, dict):
+            return None
+        cat_data = max_metrics.get(category)
+        if not cat_data or not isinstance(cat_data, dict):
+            return None
+        return cat_data.get("vo2MaxValue")
+
+    def _secs_to_hours(self, value: Union[float, int, None]) -> Optional[float]:
+        if value is None:
+            return None
+        return round(self._secs_to_minutes(value) / 60, 2)
+
+    def _secs_to_minutes(self, value: Union[float, int, None]) -> Optional[float]:
+        if value is None:
+            return None
+        return round(value / 60, 2)
+
+    def _safe_round(self, value: Union[float, int, None], divider: int = 1, points: int = 2) -> Optional[float]:
+        if value is None:
+            return None
+        return round(value / divider, points)
+
+
+class GarminHealthProvider(GarminDayMapping, HealthProvider):
+    def __init__(self, garmin: Optional[garminconnect.Garmin] = None):
         self.logger = logging.getLogger("health-tracker")
-        self._setup_auth()
+        if garmin is None:
+            self._setup_auth()
+        else:
+            self.garmin = garmin
+        self.max_range_days = RANGE_DAYS if config_get_bool('garmin.range_fetch', True) else 1
+        self.fields: Set[str] = set(METRICS)
+
+    def require_fields(self, fields: Iterable[str]) -> None:
+        self.fields = {field for field in fields if field in METRICS}
+        skipped = sorted({m.payload for m in METRICS.values()} - {METRICS[f].payload for f in self.fields})
+        if skipped:
+            self.logger.info(f"Garmin payloads not needed by the mapping, skipped: {', '.join(skipped)}")
 
     def _setup_auth(self):
         """Setup Garmin authentication"""
@@ -22,54 +146,136 @@ class GarminHealthProvider(HealthProvider):
         garmin_oauth_token_path = garmin_token_dir / "oauth2_token.json"
 
         if not garmin_oauth_token_path.exists():
-            garth.login(os.environ.get("GARMIN_EMAIL"), os.environ.get("GARMIN_PASSWORD"))
+            api_call("garmin", "login", garth.login, os.environ.get("GARMIN_EMAIL"), os.environ.get("GARMIN_PASSWORD"))
             garth.save(str(garmin_token_dir))
 
         self.garmin = garminconnect.Garmin()
-        self.garmin.login(tokenstore=str(garmin_token_dir))
+        configure_garmin(self.garmin)
+        api_call("garmin", "login", self.garmin.login, tokenstore=str(garmin_token_dir))
 
     def get_data_for_date(self, date: str) -> DayHealthData:
         """Get all Garmin data for a specific date"""
+        payloads = {METRICS[field].payload for field in self.fields}
         try:
-            data = self.garmin.get_stats_and_body(cdate=date)
-            sleep_data = self.garmin.get_sleep_data(cdate=date)
-            sleep_dto = sleep_data.get("dailySleepDTO", {})
-            max_metrics = self.garmin.get_max_metrics(cdate=date) or {}
-
-            avg_stress = data.get("averageStressLevel") if data.get("averageStressLevel", -1) >= 0 else None
-
-            return DayHealthData(
-                date=date,
-                sleep_hours=self._secs_to_hours(sleep_dto.get("sleepTimeSeconds")),
-                sleep_score=self._safe_round(sleep_dto.get("sleepScores", {}).get("overall", {}).get("value")),
-                sleep_deep_hours=self._secs_to_hours(sleep_dto.get("deepSleepSeconds")),
-                sleep_rem_hours=self._secs_to_hours(sleep_dto.get("remSleepSeconds")),
-                sleep_awake_minutes=self._secs_to_minutes(sleep_dto.get("awakeSleepSeconds")),
-                sleep_awake_count=sleep_dto.get("awakeCount"),
-                average_sleep_stress=self._safe_round(sleep_dto.get("avgSleepStress")),
-                sleep_needed_hours=self._secs_to_minutes(sleep_dto.get("sleepNeed", {}).get("actual")),
-                average_spo2_value=self._safe_round(sleep_dto.get("averageSpO2Value")),
-                average_overnight_hrv=self._safe_round(sleep_data.get("avgOvernightHrv")),
-                resting_heart_rate=sleep_data.get("restingHeartRate"),
-                average_stress_level=avg_stress,
-                stress_hours=self._secs_to_hours(data.get("stressDuration")),
-                weight=self._safe_round(data.get("weight"), 1000),
-                body_battery=data.get("bodyBatteryAtWakeTime"),
-                run_vo2max=self._safe_round(self._safe_get_vo2max(max_metrics, "generic")),
-                bike_vo2max=self._safe_round(self._safe_get_vo2max(max_metrics, "cycling")),
-                bike_ftp=self._get_ftp_for_date(date),
-                total_steps=data.get("totalSteps"),
-            )
+            data = {}
+            if "stats" in payloads:
+                data["stats"] = api_call("garmin", "get_stats_and_body", self.garmin.get_stats_and_body, cdate=date)
+            if "sleep" in payloads:
+                data["sleep"] = api_call("garmin", "get_sleep_data", self.garmin.get_sleep_data, cdate=date)
+            if "max_metrics" in payloads:
+                data["max_metrics"] = api_call("garmin", "get_max_metrics", self.garmin.get_max_metrics, cdate=date)
+            if "ftp" in payloads:
+                data["ftp"] = self._get_ftp_for_date(date)
+            return self._to_day_health_data(date, data, self.fields)
         except Exception as e:
             self.logger.error(f"Error getting Garmin data for {date}: {e}")
             raise
 
+    def get_data_for_range(self, start_date: str, end_date: str) -> List[DayHealthData]:
+        """Get Garmin data for up to RANGE_DAYS days with range endpoints.
+
+        Steps, stress, weight, body battery, VO2max and FTP come from one call
+        each for the whole window. Sleep (which also carries overnight HRV and
+        resting HR) has no range endpoint and is still fetched per day. Only the
+        endpoints of the required fields are called.
+        """
+        dates = days_between(start_date, end_date)
+        if len(dates) > RANGE_DAYS:
+            raise ValueError(f"Garmin range requests are limited to {RANGE_DAYS} days, got {len(dates)}")
+
+        endpoints = {endpoint for field in self.fields for endpoint in METRICS[field].range_endpoints}
+        steps, stress, body, battery, max_metrics, ftp = [], [], {}, [], [], {}
+        try:
+            if "steps" in endpoints:
+                steps = api_call("garmin", "get_daily_steps", self.garmin.get_daily_steps, start_date, end_date) or []
+            if "stress" in endpoints:
+                stress = api_call("garmin", "stats/stress/daily", self.garmin.connectapi,
+                                  f"{STRESS_RANGE_URL}/{start_date}/{end_date}") or []
+            if "body_composition" in endpoints:
+                body = api_call("garmin", "get_body_composition", self.garmin.get_body_composition,
+                                start_date, end_date) or {}
+            if "body_battery" in endpoints:
+                battery = api_call("garmin", "get_body_battery", self.garmin.get_body_battery,
+                                   start_date, end_date) or []
+            if "max_metrics" in endpoints:
+                max_metrics = api_call("garmin", "maxmet/daily", self.garmin.connectapi,
+                                       f"{MAX_METRICS_RANGE_URL}/{start_date}/{end_date}") or []
+            if "ftp" in endpoints:
+                ftp = self._get_ftp_for_range(start_date, end_date)
+
+            stats = self._range_stats(dates, steps, stress, body)
+            battery_by_date = {b.get("date"): b for b in battery if isinstance(b, dict)}
+            metrics_by_date = self._max_metrics_by_date(max_metrics)
+
+            days = []
+            for date in dates:
+                sleep_data = {}
+                if "sleep" in endpoints:
+                    sleep_data = api_call("garmin", "get_sleep_data", self.garmin.get_sleep_data, cdate=date)
+                if "body_battery" in endpoints:
+                    stats[date]["bodyBatteryAtWakeTime"] = self._body_battery_at_wake(
+                        battery_by_date.get(date), sleep_data.get("dailySleepDTO", {})
+                    )
+                days.append(self._to_day_health_data(date, {
+                    "stats": stats[date],
+                    "sleep": sleep_data,
+                    "max_metrics": metrics_by_date.get(date, {}),
+                    "ftp": ftp.get(date),
+                }, self.fields))
+            return days
+        except Exception as e:
+            self.logger.error(f"Error getting Garmin data for {start_date}..{end_date}: {e}")
+            raise
+
+    def _range_stats(self, dates: List[str], steps: list, stress: list, body: dict) -> Dict[str, dict]:
+        """Rebuild the per-day get_stats_and_body fields from range responses"""
+        stats = {date: {} for date in dates}
+        for entry in steps:
+            if entry.get("calendarDate") in stats:
+                stats[entry["calendarDate"]]["totalSteps"] = entry.get("totalSteps")
+        for entry in stress:
+            values = entry.get("values") or {}
+            if entry.get("calendarDate") in stats:
+                durations = [values.get(k) for k in ("lowStressDuration", "mediumStressDuration", "highStressDuration")]
+                stats[entry["calendarDate"]].update(
+                    averageStressLevel=values.get("overallStressLevel"),
+                    stressDuration=sum(d for d in durations if d is not None)
+                    if any(d is not None for d in durations) else None,
+                )
+        for entry in body.get("dateWeightList") or []:
+            if entry.get("calendarDate") in stats and entry.get("weight") is not None:
+                stats[entry["calendarDate"]]["weight"] = entry["weight"]
+        return stats
+
+    def _max_metrics_by_date(self, max_metrics) -> Dict[str, dict]:
+        entries = max_metrics if isinstance(max_metrics, list) else [max_metrics]
+        by_date: Dict[str, dict] = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            for category in ("generic", "cycling"):
+                if isinstance(entry.get(category), dict) and entry[category].get("calendarDate"):
+                    by_date.setdefault(entry[category]["calendarDate"], {})[category] = entry[category]
+        return by_date
+
+    def _body_battery_at_wake(self, battery: Optional[dict], sleep_dto: dict) -> Optional[int]:
+        """First body battery reading at or after the end of the night's sleep"""
+        wake = sleep_dto.get("sleepEndTimestampGMT")
+        values = [v for v in (battery or {}).get("bodyBatteryValuesArray") or [] if v and v[1] is not None]
+        if not values:
+            return None
+        if wake is not None:
+            for timestamp, level in values:
+                if timestamp >= wake:
+                    return level
+        return values[0][1]
+
     def _get_ftp_for_date(self, date: str) -> Optional[float]:
         try:
-            activities = self.garmin.get_activities_by_date(date, date)
+            activities = api_call("garmin", "get_activities_by_date", self.garmin.get_activities_by_date, date, date)
             cycling = [a for a in activities if "cycling" in str(a.get("activityType", "")).lower()]
             for act in cycling:
-                details = self.garmin.get_activity(act["activityId"])
+                details = api_call("garmin", "get_activity", self.garmin.get_activity, act["activityId"])
                 ftp = details.get("summaryDTO", {}).get("functionalThresholdPower")
                 if ftp:
                     return ftp
@@ -77,25 +283,27 @@ class GarminHealthProvider(HealthProvider):
         except Exception:
             return None
 
-    def _safe_get_vo2max(self, max_metrics, category) -> Optional[float]:
-        if not max_metrics or not isinstance(max_metrics, dict):
-            return None
-        cat_data = max_metrics.get(category)
-        if not cat_data or not isinstance(cat_data, dict):
-            return None
-        return cat_data.get("vo2MaxValue")
-
-    def _secs_to_hours(self, value: Union[float, int, None]) -> Optional[float]:
-        if value is None:
-            return None
-        return round(self._secs_to_minutes(value) / 60, 2)
-
-    def _secs_to_minutes(self, value: Union[float, int, None]) -> Optional[float]:
-        if value is None:
-            return None
-        return round(value / 60, 2)
+    def _get_ftp_for_range(self, start_date: str, end_date: str) -> Dict[str, float]:
+        """FTP per date from one activity listing for the whole window"""
+        ftp: Dict[str, float] = {}
+        try:
+            activities = api_call("garmin", "get_activities_by_date", self.garmin.get_activities_by_date,
+                                  start_date, end_date)
+        except Exception:
+            return ftp
 
-    def _safe_round(self, value: Union[float, int, None], divider: int = 1, points: int = 2) -> Optional[float]:
-        if value is None:
-            return None
-        return round(value / divider, points)
+        cycling_by_date = defaultdict(list)
+        for act in activities or []:
+            if "cycling" in str(act.get("activityType", "")).lower():
+                cycling_by_date[str(act.get("startTimeLocal", ""))[:10]].append(act)
+        for date, cycling in cycling_by_date.items():
+            for act in cycling:
+                try:
+                    details = api_call("garmin", "get_activity", self.garmin.get_activity, act["activityId"])
+                except Exception:
+                    continue
+                value = details.get("summaryDTO", {}).get("functionalThresholdPower")
+                if value:
+                    ftp[date] = value
+                    break
+        return ftp
@@ -0,0 +1,159 @@
+import json
+import logging
+import re
+import threading
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from health_tracker.data.day_health_data import DayHealthData
+from health_tracker.provider.abstract.health_provider import HealthProvider, days_between
+from health_tracker.provider.health.garmin import GarminDayMapping
+from health_tracker.utils.config_loader import config_get_path
+
+SLEEP_MEMBER = re.compile(r"sleepData\.json$")
+SUMMARY_MEMBER = re.compile(r"UDSFile.*\.json$")
+BIOMETRICS_MEMBER = re.compile(r"userBioMetrics\.json$")
+MAX_METRICS_MEMBER = re.compile(r"MaxMetData.*\.json$")
+MEMBER_RANGE = re.compile(r"(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})")
+
+
+class GarminExportHealthProvider(GarminDayMapping, HealthProvider):
+    """Reads health data from a Garmin Connect account data export (the ZIP from
+    Account → Data Management → Export Your Data) instead of the API.
+
+    Members are read straight from the archive, one at a time. Sleep and daily
+    summary files carry their date range in the name, so only the members
+    overlapping the requested days are parsed.
+    """
+
+    max_range_days = 366
+
+    def __init__(self, archive: Optional[Path] = None):
+        self.logger = logging.getLogger("health-tracker")
+        self.archive = archive or config_get_path('garmin_export.archive', env_key='GARMIN_EXPORT_ARCHIVE')
+        if not self.archive or not self.archive.exists():
+            raise ValueError("Missing Garmin export archive. Set GARMIN_EXPORT_ARCHIVE env var or configure in config.yaml")
+
+        self._zip = zipfile.ZipFile(self.archive)
+        self._loaded: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, dict] = {}
+        self._sleep: Dict[str, dict] = {}
+        self._max_metrics: Dict[str, dict] = {}
+
+    def get_data_for_date(self, date: str) -> DayHealthData:
+        return self.get_data_for_range(date, date)[0]
+
+    def get_data_for_range(self, start_date: str, end_date: str) -> List[DayHealthData]:
+        with self._lock:
+            self._load(start_date, end_date)
+        days = []
+        for date in days_between(start_date, end_date):
+            if date not in self._stats and date not in self._sleep:
+                raise ValueError(f"No data for {date} in Garmin export {self.archive.name}")
+            days.append(self._to_day_health_data(date, {
+                "stats": self._stats.get(date, {}),
+                "sleep": self._sleep.get(date, {}),
+                "max_metrics": self._max_metrics.get(date, {}),
+            }))
+        return days
+
+    def _load(self, start_date: str, end_date: str) -> None:
+        for info in self._zip.infolist():
+            name = info.filename
+            if name in self._loaded or info.is_dir() or not self._overlaps(name, start_date, end_date):
+                continue
+
+            if SLEEP_MEMBER.search(name):
+                parse = self._parse_sleep
+            elif SUMMARY_MEMBER.search(name):
+                parse = self._parse_summary
+            elif BIOMETRICS_MEMBER.search(name):
+                parse = self._parse_biometrics
+            elif MAX_METRICS_MEMBER.search(name):
+                parse = self._parse_max_metrics
+            else:
+                continue
+
+            with self._zip.open(info) as member:
+                try:
+                    entries = json.load(member)
+                except json.JSONDecodeError as e:
+                    self.logger.warning(f"Skipping unreadable export member {name}: {e}")
+                    entries = []
+            for entry in entries if isinstance(entries, list) else [entries]:
+                if isinstance(entry, dict):
+                    parse(entry)
+            self._loaded.add(name)
+
+    def _overlaps(self, name: str, start_date: str, end_date: str) -> bool:
+        match = MEMBER_RANGE.search(name)
+        return not match or (match.group(1) <= end_date and match.group(2) >= start_date)
+
+    def _parse_sleep(self, entry: dict) -> None:
+        date = _calendar_date(entry)
+        if not date:
+            return
+        sleep_seconds = entry.get("sleepTimeSeconds")
+        if sleep_seconds is None:
+            parts = [entry.get(k) for k in ("deepSleepSeconds", "lightSleepSeconds", "remSleepSeconds")]
+            sleep_seconds = sum(p for p in parts if p) if any(parts) else None
+
+        scores = entry.get("sleepScores") or {}
+        spo2 = entry.get("spo2SleepSummary") or {}
+        self._sleep.setdefault(date, {}).update({
+            "dailySleepDTO": {
+                "sleepTimeSeconds": sleep_seconds,
+                "sleepScores": {"overall": {"value": scores.get("overallScore")}},
+                "deepSleepSeconds": entry.get("deepSleepSeconds"),
+                "remSleepSeconds": entry.get("remSleepSeconds"),
+                "awakeSleepSeconds": entry.get("awakeSleepSeconds"),
+                "awakeCount": entry.get("awakeCount"),
+                "avgSleepStress": entry.get("avgSleepStress"),
+                "sleepNeed": entry.get("sleepNeed") or {},
+                "averageSpO2Value": spo2.get("averageSPO2") or entry.get("averageSpO2Value"),
+            },
+            "avgOvernightHrv": entry.get("avgOvernightHrv"),
+        })
+
+    def _parse_summary(self, entry: dict) -> None:
+        date = _calendar_date(entry)
+        if not date:
+            return
+        stress = next(
+            (a for a in (entry.get("allDayStress") or {}).get("aggregatorList") or [] if a.get("type") == "TOTAL"), {}
+        )
+        wake_battery = next(
+            (s.get("statsValue") for s in (entry.get("bodyBattery") or {}).get("bodyBatteryStatList") or []
+             if s.get("bodyBatteryStatType") == "WAKEUP"), None
+        )
+        stats = self._stats.setdefault(date, {})
+        stats.update(
+            totalSteps=entry.get("totalSteps"),
+            averageStressLevel=stress.get("averageStressLevel"),
+            stressDuration=stress.get("stressDuration"),
+            bodyBatteryAtWakeTime=wake_battery,
+        )
+        # The API reports resting HR with sleep, the export with the daily summary
+        if entry.get("restingHeartRate") is not None:
+            self._sleep.setdefault(date, {})["restingHeartRate"] = entry["restingHeartRate"]
+
+    def _parse_biometrics(self, entry: dict) -> None:
+        date = _calendar_date(entry)
+        if date and entry.get("weight") is not None:
+            self._stats.setdefault(date, {})["weight"] = entry["weight"]
+
+    def _parse_max_metrics(self, entry: dict) -> None:
+        date = _calendar_date(entry)
+        if not date or entry.get("vo2MaxValue") is None:
+            return
+        category = "cycling" if str(entry.get("sport", "")).upper() == "CYCLING" else "generic"
+        self._max_metrics.setdefault(date, {})[category] = {"vo2MaxValue": entry["vo2MaxValue"]}
+
+
+def _calendar_date(entry: dict) -> Optional[str]:
+    value = entry.get("calendarDate") or (entry.get("metaData") or {}).get("calendarDate")
+    if isinstance(value, dict):
+        value = value.get("date")
+    return str(value)[:10] if value else None
@@ -2,10 +2,12 @@ from enum import Enum
 from functools import cached_property
 
 from health_tracker.provider.health.garmin import GarminHealthProvider
+from health_tracker.provider.health.garmin_export import GarminExportHealthProvider
 
 
 class HealthSource(Enum):
     GARMIN = ("garmin", GarminHealthProvider)
+    GARMIN_EXPORT = ("garmin-export", GarminExportHealthProvider)
 
     def __init__(self, label: str, provider_cls):
         self._label = label
@@ -1,51 +1,378 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable, Iterator, List, Optional, Set, Tuple
 
 import pandas as pd
 
 
+from health_tracker.analytics.rollups import Rollups
+from health_tracker.analytics.training_metrics import TrainingMetrics
+from health_tracker.data.activity_data import ActivityData
+from health_tracker.data.day_health_data import DayHealthData
+from health_tracker.data.record import from_json_dict, to_json_dict
 from health_tracker.destination.destination import Target
+from health_tracker.provider.abstract.health_provider import HealthProvider
 from health_tracker.provider.activities.activities_source import ActivitiesSource
 from health_tracker.provider.health.health_source import HealthSource
-from health_tracker.utils.config_loader import config_get_int
+from health_tracker.utils.config_loader import config_get_int, config_get_bool
 
+from health_tracker.utils.pipeline import BatchPipeline, bounded_map
+from health_tracker.utils.retry_queue import RetryQueue
+from health_tracker.utils.run_lock import RunLock
+from health_tracker.utils.sync_ledger import SETTLED_FIELD, SyncLedger
 from health_tracker.utils.click_styling import info, error, success, step
 
 
+@dataclass
+class SyncResult:
+    kind: str
+    source: str
+    target: str
+    synced: int = 0
+    failed: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.failed == 0 and self.error is None
+
+    def summary(self) -> str:
+        line = (f"{self.kind} {self.source} → {self.target}: {self.synced} synced, {self.failed} failed, "
+                f"{self.skipped} skipped in {self.seconds:.1f}s")
+        return f"{line} ({self.error})" if self.error else line
+
+
 class SyncService:
     def __init__(self):
         self.logger = logging.getLogger("health-tracker")
+        self.metrics = TrainingMetrics() if config_get_bool('analytics.enabled', True) else None
+        self.rollups = Rollups() if config_get_bool('rollups.enabled', False) else None
+        self.fetch_workers = config_get_int('sync.fetch_workers', 1)
+        self.pipeline = BatchPipeline()
+        self.ledger_file = None
+        self.retry_queue_file = None
+        self.lock_dir = None
+        self.lock_wait = config_get_bool('sync.lock.wait', True)
 
-    def sync_health(self, source: HealthSource, target: Target, start_date: str, end_date: str):
+    def sync_health(self, source: HealthSource, target: Target, start_date: str, end_date: str,
+                    force: bool = False) -> SyncResult:
+        return self._locked("health", source, target, start_date, end_date,
+                            lambda covered: self._sync_health(source, target, start_date, end_date, force, covered))
+
+    def sync_activities(self, source: ActivitiesSource, target: Target, start_date: str,
+                        end_date: str) -> SyncResult:
+        return self._locked("activities", source, target, start_date, end_date,
+                            lambda covered: self._sync_activities(source, target, start_date, end_date, covered))
+
+    def _sync_health(self, source: HealthSource, target: Target, start_date: str, end_date: str,
+                     force: bool, covered: Optional[Tuple[str, str]]) -> SyncResult:
+        started = time.perf_counter()
+        result = SyncResult("health", source.label, target.label)
+        failed: List[str] = []
+        target.prepare()
         provider = source.provider
-        dates = pd.date_range(start=start_date, end=end_date, freq="D").strftime("%Y-%m-%d")
+        ledger = SyncLedger(source.label, target.label, self.ledger_file, self._settled_field(target, provider))
+        retry = RetryQueue("health", source.label, target.label, self.retry_queue_file)
+        labels = {"source": source.label, "target": target.label}
+        provider.require_fields(self._health_fields(target))
+        dates = list(pd.date_range(start=start_date, end=end_date, freq="D").strftime("%Y-%m-%d"))
+        if not force:
+            settled = [d for d in dates if ledger.is_settled(d)]
+            result.skipped = len(settled)
+            if settled:
+                info(f"Skipping {len(settled)} settled days already synced to {target.label} (use --force to resync)")
+                dates = [d for d in dates if not ledger.is_settled(d)]
+            if covered:
+                just_synced = set(pd.date_range(*covered, freq="D").strftime("%Y-%m-%d"))
+                remaining = [d for d in dates if d not in just_synced]
+                result.skipped += len(dates) - len(remaining)
+                info(f"Skipping {len(dates) - len(remaining)} days just synced by the run this one waited for")
+                dates = remaining
+
+        # Days that failed on earlier runs go first: written from their stored payload or fetched again
+        pending = set(dates)
+        queued = [(d, payload) for d, payload in retry.due() if d not in pending]
+        replay = [(d, from_json_dict(DayHealthData, payload)) for d, payload in queued if payload]
+        if queued:
+            info(f"Retrying {len(queued)} queued {source.label} health days first")
+            dates = [d for d, payload in queued if not payload] + dates
 
-        for current_date in dates:
+        def fetch(current_date: str) -> Optional[Tuple[str, DayHealthData]]:
             step(f"→ Processing {current_date} (health from {source.label})...")
             try:
-                data = provider.get_data_for_date(current_date)
-                target.update_health_data(current_date, data)
-                self._log_success(f"{source.label} health synced for {current_date}")
+                return current_date, provider.get_data_for_date(current_date)
             except Exception as e:
-                self._log_error(f"Error syncing {source.label} health for {current_date}: {e}")
+                failed.append(current_date)
+                self._log_error(f"Error syncing {source.label} health for {current_date}: {e}",
+                                date=current_date, **labels)
+                self._retry_later(retry, current_date, e)
+                return None
 
-    def sync_activities(self, source: ActivitiesSource, target: Target, start_date: str, end_date: str):
+        def write(batch: List[Tuple[str, DayHealthData]]):
+            write_started = time.perf_counter()
+            try:
+                if self.metrics:
+                    self.metrics.enrich_health([data for _, data in batch])
+                target.update_health_batch(batch)
+            except Exception as e:
+                for current_date, data in batch:
+                    failed.append(current_date)
+                    self._log_error(f"Error syncing {source.label} health for {current_date}: {e}",
+                                    date=current_date, **labels)
+                    self._retry_later(retry, current_date, e, to_json_dict(data))
+                return
+            duration = round(time.perf_counter() - write_started, 3)
+            result.synced += len(batch)
+            if self.rollups:
+                self.rollups.record_health(target.label, [data for _, data in batch])
+            for current_date, data in batch:
+                ledger.record(current_date, data)
+                retry.done(current_date)
+                self._log_success(f"{source.label} health synced for {current_date}",
+                                  date=current_date, duration=duration, **labels)
+
+        def fetch_window(window: List[str]) -> List[Tuple[str, DayHealthData]]:
+            step(f"→ Processing {window[0]}..{window[-1]} (health from {source.label})...")
+            try:
+                return list(zip(window, provider.get_data_for_range(window[0], window[-1])))
+            except Exception as e:
+                self.logger.warning(f"Range fetch {window[0]}..{window[-1]} failed ({e}), falling back to single days")
+                return [item for item in map(fetch, window) if item is not None]
+
+        if provider.max_range_days > 1:
+            windows = self._windows(list(dates), provider.max_range_days)
+            fetched = self._flatten(bounded_map(fetch_window, windows, self.fetch_workers))
+        else:
+            fetched = (item for item in bounded_map(fetch, dates, self.fetch_workers) if item is not None)
+        try:
+            self.pipeline.run(chain(replay, fetched), write)
+        finally:
+            ledger.save()
+            retry.save()
+            self._save_metrics()
+            self._write_rollups(target)
+            result.failed = len(failed)
+            result.seconds = time.perf_counter() - started
+        return result
+
+    def _sync_activities(self, source: ActivitiesSource, target: Target, start_date: str, end_date: str,
+                         covered: Optional[Tuple[str, str]]) -> SyncResult:
+        started = time.perf_counter()
+        result = SyncResult("activities", source.label, target.label)
+        if covered:
+            remaining = self._uncovered(start_date, end_date, covered)
+            if remaining is None:
+                info(f"{source.label} activities {start_date} → {end_date} were just synced by the run this one waited for")
+                return result
+            start_date, end_date = remaining
+        target.prepare()
         provider = source.provider(target)
+        provider.require_fields(self._activity_fields(target))
+        retry = RetryQueue("activities", source.label, target.label, self.retry_queue_file)
+        labels = {"source": source.label, "target": target.label}
+        synced = failed = 0
+
+        # Activities whose write failed on earlier runs go first from their stored payload;
+        # ranges whose fetch failed are listed again
+        queued = retry.due()
+        replay = [from_json_dict(ActivityData, payload) for _, payload in queued if payload]
+        replay_ids = {a.id for a in replay}
+        ranges = [unit.split("|") for unit, payload in queued if not payload]
+        if queued:
+            info(f"Retrying {len(queued)} queued {source.label} activities and ranges first")
+
+        def fetch_range(range_start: str, range_end: str) -> Iterator[ActivityData]:
+            unit = f"{range_start}|{range_end}"
+            try:
+                # An upserting target keeps itself free of duplicates, so edited activities are synced again
+                for activity in provider.iter_activities_by_date_range(range_start, range_end,
+                                                                       skip_processed=not target.upserts_activities):
+                    if activity.id not in replay_ids:
+                        yield activity
+            except Exception as e:
+                self._log_error(f"Error fetching {source.label} activities {range_start} → {range_end}: {e}",
+                                **labels)
+                self._retry_later(retry, unit, e)
+                result.error = str(e)
+                return
+            retry.done(unit)
+
+        def write(batch: List[ActivityData]):
+            nonlocal synced, failed
+            try:
+                if self.metrics:
+                    self.metrics.record_activities(batch)
+                target.update_activities(batch)
+                provider.mark_as_processed({a.id for a in batch})
+            except Exception as e:
+                failed += len(batch)
+                self._log_error(f"Error syncing {len(batch)} {source.label} activities: {e}", **labels)
+                for activity in batch:
+                    self._retry_later(retry, activity.id, e, to_json_dict(activity))
+                return
+            for activity in batch:
+                retry.done(activity.id)
+            if self.rollups:
+                self.rollups.record_activities(target.label, batch)
+            synced += len(batch)
+
         try:
-            activities = provider.fetch_activities_by_date_range(start_date, end_date)
-            if not activities:
+            activities = chain(replay, *(fetch_range(*r) for r in ranges), fetch_range(start_date, end_date))
+            self.pipeline.run(activities, write)
+            if synced:
+                self._log_success(f"Synced {synced} {source.label} activities",
+                                  duration=round(time.perf_counter() - started, 3), **labels)
+            elif not failed and not result.error:
                 info(f"No {source.label} activities to sync")
-                return
+        except Exception as e:
+            if synced:
+                self._log_success(f"Synced {synced} {source.label} activities before the error", **labels)
+            self._log_error(f"Error syncing {source.label} activities: {e}", **labels)
+            result.error = str(e)
+        finally:
+            retry.save()
+            self._save_metrics()
+            self._write_rollups(target)
+            result.synced = synced
+            result.failed = failed
+            result.seconds = time.perf_counter() - started
+        return result
+
+    def sync_all(self, health_source: HealthSource, activities_source: ActivitiesSource, target: Target,
+                 health_range: Tuple[str, str], activities_range: Tuple[str, str],
+                 force: bool = False) -> List[SyncResult]:
+        """Run the health and activities syncs concurrently against one shared target"""
+        # Authenticate and validate the destination once, before both flows race for it
+        target.prepare()
+
+        def run(kind: str, label: str, sync, *args) -> SyncResult:
+            try:
+                return sync(*args)
+            except Exception as e:
+                self._log_error(f"{kind.capitalize()} sync failed: {e}", source=label, target=target.label)
+                return SyncResult(kind, label, target.label, error=str(e))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            health = executor.submit(run, "health", health_source.label, self.sync_health,
+                                     health_source, target, *health_range, force)
+            activities = executor.submit(run, "activities", activities_source.label, self.sync_activities,
+                                         activities_source, target, *activities_range)
+            return [health.result(), activities.result()]
+
+    def _locked(self, kind: str, source, target: Target, start_date: str, end_date: str,
+                sync: Callable[[Optional[Tuple[str, str]]], SyncResult]) -> SyncResult:
+        """Run ``sync`` under the cross-process lock of this kind, source and target.
+
+        ``sync`` gets the range a run it waited for has just synced, if any.
+        """
+        lock = RunLock(kind, source.label, target.label, self.lock_dir)
+        waiting = lambda holder: info(f"{kind.capitalize()} sync {source.label} → {target.label} {holder}, waiting")
+        if not lock.acquire(start_date, end_date, wait=self.lock_wait, on_wait=waiting):
+            holder = lock.describe_holder()
+            info(f"{kind.capitalize()} sync {source.label} → {target.label} {holder}, exiting")
+            return SyncResult(kind, source.label, target.label, error=holder)
+        ok = False
+        try:
+            result = sync(lock.covered)
+            ok = result.ok
+            return result
+        finally:
+            lock.release(ok)
+
+    @staticmethod
+    def _uncovered(start: str, end: str, covered: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+        """The part of start..end outside ``covered``; all of it when ``covered`` sits strictly inside"""
+        first, last, covered_first, covered_last = (pd.Timestamp(v) for v in (start, end, *covered))
+        if covered_first <= first and last <= covered_last:
+            return None
+        if covered_first <= first <= covered_last:
+            first = covered_last
+        elif covered_first <= last <= covered_last:
+            last = covered_first
+        return first.strftime("%Y-%m-%d %H:%M:%S"), last.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _health_fields(self, target: Target) -> Set[str]:
+        """Fields the target's mapping and the analytics read; the ledger's settle field is one of the mapped ones"""
+        fields = target.health_fields()
+        if self.rollups:
+            fields |= self.rollups.health_inputs()
+        return fields | self.metrics.health_inputs() if self.metrics else fields
 
-            target.update_activities(activities)
-            provider.mark_as_processed({a.id for a in activities})
-            self._log_success(f"Synced {len(activities)} {source.label} activities")
+    @staticmethod
+    def _settled_field(target: Target, provider: HealthProvider) -> Optional[str]:
+        """Mapped field whose presence settles a day: sleep data if mapped, else the first one the source fetches.
+
+        ``date`` and the derived analytics fields are always set, so they never
+        qualify; with no such field mapped, days are never settled.
+        """
+        mapped = target.health_fields()
+        candidates = [field for field in provider.provided_fields() if field in mapped]
+        if SETTLED_FIELD in candidates:
+            return SETTLED_FIELD
+        return candidates[0] if candidates else None
+
+    def _activity_fields(self, target: Target) -> Set[str]:
+        fields = target.activity_fields()
+        if self.rollups:
+            fields |= self.rollups.activity_inputs()
+        return fields | self.metrics.activity_inputs() if self.metrics else fields
+
+    @staticmethod
+    def _windows(dates: List[str], size: int) -> List[List[str]]:
+        """Split dates into runs of consecutive days, at most ``size`` days long"""
+        windows: List[List[str]] = []
+        previous = None
+        for current in dates:
+            day = pd.Timestamp(current)
+            if not windows or len(windows[-1]) >= size or day - previous != pd.Timedelta(days=1):
+                windows.append([])
+            windows[-1].append(current)
+            previous = day
+        return windows
+
+    @staticmethod
+    def _flatten(batches: Iterator[List[Tuple[str, DayHealthData]]]) -> Iterator[Tuple[str, DayHealthData]]:
+        for batch in batches:
+            yield from batch
+
+    def _retry_later(self, retry: RetryQueue, unit: str, error: Exception, payload: Optional[dict] = None):
+        if not retry.fail(unit, error, payload):
+            self._log_error(f"Giving up on {unit} after {retry.max_attempts} attempts, left in {retry.queue_file}")
+
+    def _save_metrics(self):
+        if not self.metrics:
+            return
+        try:
+            self.metrics.save()
+        except Exception as e:
+            self._log_error(f"Error saving training metrics history: {e}")
+
+    def _write_rollups(self, target: Target):
+        """Write the weekly / monthly rollups touched by this sync; unwritten periods stay pending"""
+        if not self.rollups:
+            return
+        try:
+            count = self.rollups.write(target.label, target.update_rollups)
+            if count:
+                info(f"Updated {count} rollup rows in {target.label}")
         except Exception as e:
-            self._log_error(f"Error syncing {source.label} activities: {e}")
+            self._log_error(f"Error writing rollups to {target.label}: {e}", target=target.label)
+        finally:
+            try:
+                self.rollups.save()
+            except Exception as e:
+                self._log_error(f"Error saving rollups: {e}")
 
-    def _log_success(self, msg: str):
-        self.logger.info(f"✓ {msg}")
+    def _log_success(self, msg: str, **fields):
+        """Show ``msg`` on the terminal once and log it with ``fields`` as structured extras"""
         success(f"✓ {msg}")
+        self.logger.info(f"✓ {msg}", extra={"echoed": True, **fields})
 
-    def _log_error(self, msg: str):
-        self.logger.error(f"✗ {msg}")
+    def _log_error(self, msg: str, **fields):
         error(f"✗ {msg}")
+        self.logger.error(f"✗ {msg}", extra={"echoed": True, **fields})
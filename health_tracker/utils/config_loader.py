@@ -4,6 +4,21 @@ from pathlib import Path
 from typing import Any, Dict, Optional, Union
 from functools import lru_cache
 
+# Per-athlete state; a profile that does not set one gets its own copy under profiles/<name>/
+PROFILE_STATE_KEYS = [
+    'garmin.token_dir',
+    'garmin.activities.processed_file',
+    'strava.token_file',
+    'strava.processed_file',
+    'activity_import.processed_file',
+    'sync.ledger_file',
+    'sync.retry.file',
+    'sync.lock.dir',
+    'notion.page_index_file',
+    'analytics.history_file',
+    'rollups.file',
+]
+
 
 class ConfigLoader:
     """Loads configuration from YAML files and environment variables with fallback support"""
@@ -15,6 +30,8 @@ class ConfigLoader:
         
         self._default_config = self._load_yaml(self.default_config_path) or {}
         self._local_config = self._load_yaml(self.local_config_path) or {}
+        self._profile_config: Dict[str, Any] = {}
+        self.profile: Optional[str] = None
     
     def _find_project_root(self) -> Path:
         """Find the project root directory by looking for pyproject.toml or setup.py"""
@@ -40,10 +57,11 @@ class ConfigLoader:
     def get(self, key: str, default: Any = None, env_key: Optional[str] = None) -> Any:
         """
         Get configuration value with fallback priority:
-        1. Environment variable (if env_key provided)
-        2. Local config (config/config.yaml)
-        3. Default config (health_tracker/config/config.yaml)
-        4. Default value
+        1. Active profile (profiles.<name> in config, see use_profile)
+        2. Environment variable (if env_key provided)
+        3. Local config (config/config.yaml)
+        4. Default config (health_tracker/config/config.yaml)
+        5. Default value
         
         Args:
             key: Dot-notation key (e.g., 'google_sheets.spreadsheet_url')
@@ -53,6 +71,10 @@ class ConfigLoader:
         Returns:
             Configuration value
         """
+        profile_value = self._get_nested(self._profile_config, key)
+        if profile_value is not None:
+            return profile_value
+
         if env_key:
             env_value = os.environ.get(env_key)
             if env_value is not None:
@@ -142,6 +164,49 @@ class ConfigLoader:
         
         print(f"Local config structure ready at: {local_config_dir}")
     
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        """Athlete profiles from the ``profiles`` section, by name"""
+        return {str(name): profile or {} for name, profile in (self.get('profiles') or {}).items()}
+
+    def use_profile(self, name: str) -> Dict[str, Any]:
+        """Overlay ``profiles.<name>`` on top of every other config source.
+
+        Profile values win over environment variables so one athlete's settings
+        never fall through to another's; per-athlete state files default to
+        ``profiles/<name>/``, which is created here.
+        """
+        profiles = self.profiles()
+        if name not in profiles:
+            raise ValueError(f"Unknown profile {name}, configured: {', '.join(profiles) or 'none'}")
+
+        self._profile_config = {}
+        state = {}
+        for key in PROFILE_STATE_KEYS:
+            default = self.get(key)
+            if default is not None:
+                self._set_nested(state, key, str(Path("profiles") / name / Path(default).name))
+        self._profile_config = self._merge(state, profiles[name])
+        self.profile = name
+        for key in PROFILE_STATE_KEYS:
+            path = self.get_path(key)
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+        return profiles[name]
+
+    @staticmethod
+    def _set_nested(config: Dict[str, Any], key: str, value: Any) -> None:
+        *parents, last = key.split('.')
+        for k in parents:
+            config = config.setdefault(k, {})
+        config[last] = value
+
+    @classmethod
+    def _merge(cls, base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+        merged = dict(base)
+        for k, v in override.items():
+            merged[k] = cls._merge(merged[k], v) if isinstance(v, dict) and isinstance(merged.get(k), dict) else v
+        return merged
+
     def reload(self):
         """Reload configuration files"""
         self._default_config = self._load_yaml(self.default_config_path) or {}
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from health_tracker.utils.rate_limit import get_rate_limiter, http_status
+
+
+class CallStats:
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+class Instrumentation:
+    """Counts and times every upstream/downstream API call, keyed by (service, endpoint, status)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str, str], CallStats] = {}
+
+    @contextmanager
+    def track(self, service: str, endpoint: str):
+        status = "ok"
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            status = status_of(e)
+            raise
+        finally:
+            self.record(service, endpoint, status, time.perf_counter() - started)
+
+    def record(self, service: str, endpoint: str, status: str, seconds: float) -> None:
+        with self._lock:
+            self._stats.setdefault((service, endpoint, status), CallStats()).add(seconds)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "service": service,
+                    "endpoint": endpoint,
+                    "status": status,
+                    "count": stats.count,
+                    "total_seconds": round(stats.total_seconds, 6),
+                    "max_seconds": round(stats.max_seconds, 6),
+                }
+                for (service, endpoint, status), stats in sorted(self._stats.items())
+            ]
+
+    def merge(self, rows: List[Dict[str, Any]]) -> None:
+        """Add the ``snapshot`` of another process, e.g. a run-all worker"""
+        with self._lock:
+            for r in rows:
+                stats = self._stats.setdefault((r["service"], r["endpoint"], r["status"]), CallStats())
+                stats.count += r["count"]
+                stats.total_seconds += r["total_seconds"]
+                stats.max_seconds = max(stats.max_seconds, r["max_seconds"])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def summary_lines(self) -> List[str]:
+        """Human readable table, slowest service/endpoint first"""
+        rows = sorted(self.snapshot(), key=lambda r: r["total_seconds"], reverse=True)
+        if not rows:
+            return []
+
+        lines = [f"{'service':<10}{'endpoint':<28}{'status':<8}{'calls':>7}{'total s':>10}{'avg ms':>10}{'max ms':>10}"]
+        for r in rows:
+            avg_ms = r["total_seconds"] / r["count"] * 1000
+            lines.append(
+                f"{r['service']:<10}{r['endpoint']:<28}{r['status']:<8}{r['count']:>7}"
+                f"{r['total_seconds']:>10.2f}{avg_ms:>10.1f}{r['max_seconds'] * 1000:>10.1f}"
+            )
+        return lines
+
+    def write_json(self, path: Path, command: str) -> None:
+        _atomic_write(path, json.dumps({"command": command, "timestamp": time.time(), "calls": self.snapshot()}, indent=2))
+
+    def write_prometheus(self, path: Path, command: str) -> None:
+        """Write a node_exporter textfile collector file"""
+        lines = [
+            "# HELP health_tracker_api_calls API calls made during the last run",
+            "# TYPE health_tracker_api_calls gauge",
+        ]
+        rows = self.snapshot()
+        for r in rows:
+            lines.append(f"health_tracker_api_calls{{{_labels(r, command)}}} {r['count']}")
+        lines += [
+            "# HELP health_tracker_api_call_seconds Time spent in API calls during the last run",
+            "# TYPE health_tracker_api_call_seconds gauge",
+        ]
+        for r in rows:
+            lines.append(f"health_tracker_api_call_seconds{{{_labels(r, command)}}} {r['total_seconds']}")
+        lines += [
+            "# HELP health_tracker_api_call_seconds_max Slowest API call during the last run",
+            "# TYPE health_tracker_api_call_seconds_max gauge",
+        ]
+        for r in rows:
+            lines.append(f"health_tracker_api_call_seconds_max{{{_labels(r, command)}}} {r['max_seconds']}")
+        lines += [
+            "# HELP health_tracker_last_run_timestamp_seconds Unix time of the last run",
+            "# TYPE health_tracker_last_run_timestamp_seconds gauge",
+            f'health_tracker_last_run_timestamp_seconds{{command="{command}"}} {time.time():.0f}',
+        ]
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+
+def status_of(exc: Exception) -> str:
+    """HTTP status of a client exception when known, ``error`` otherwise"""
+    status = http_status(exc)
+    return str(status) if status is not None else "error"
+
+
+def _labels(row: Dict[str, Any], command: str) -> str:
+    return f'command="{command}",service="{row["service"]}",endpoint="{row["endpoint"]}",status="{row["status"]}"'
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """Get global instrumentation instance"""
+    return _instrumentation
+
+
+def api_call(service: str, endpoint: str, fn: Callable, *args, idempotent: bool = True, **kwargs) -> Any:
+    """Call ``fn`` through the service's rate limiter, timing and counting every attempt.
+
+    Pass ``idempotent=False`` for calls that must not be repeated after a
+    server error, see RateLimiter.call.
+    """
+    def attempt():
+        with _instrumentation.track(service, endpoint):
+            return fn(*args, **kwargs)
+
+    return get_rate_limiter().call(service, attempt, idempotent=idempotent)
@@ -0,0 +1,93 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from health_tracker.utils.config_loader import config_get, config_get_path
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+STRUCTURED_FIELDS = ("date", "source", "target", "duration")
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, with the structured ``extra`` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RecordQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener's handlers.
+
+    The stock ``prepare`` formats the record with a default formatter, folding
+    the traceback into ``msg`` and dropping ``exc_info``; JSON lines would then
+    lose the separate ``exc_info`` key. The queue never leaves the process, so
+    the exception can travel as is.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class NotEchoedFilter(logging.Filter):
+    """Drops records already shown on the terminal through the click_styling helpers"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not getattr(record, "echoed", False)
+
+
+def setup_logging() -> QueueListener:
+    """Route the root logger through a queue so callers never block on console or file I/O.
+
+    Records are formatted and written by a single background listener thread;
+    ``logging.format: json`` switches both handlers to JSON lines.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    fmt = str(config_get('logging.format', 'text', env_key='HEALTH_TRACKER_LOG_FORMAT')).lower()
+    formatter = JsonLinesFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.DEBUG)
+    console_handler.setFormatter(formatter)
+    console_handler.addFilter(NotEchoedFilter())
+
+    log_file_path = config_get_path('logging.file_path', '/var/log/health-activity-tracker.log')
+    file_handler = logging.FileHandler(log_file_path, mode="a")
+    file_handler.setLevel(config_get('logging.level', 'INFO').upper())
+    file_handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(RecordQueueHandler(log_queue))
+    return _listener
@@ -11,6 +11,7 @@ from health_tracker.data.day_health_data import DayHealthData
 class DataType(Enum):
     ACTIVITY = "activity"
     HEALTH = "health"
+    ROLLUP = "rollup"
 
 
 class TargetType(Enum):
@@ -109,6 +110,9 @@ class MappingLoader:
         
         health_config_path = self.local_config_path / "health"
         health_config_path.mkdir(exist_ok=True)
+
+        rollup_config_path = self.local_config_path / "rollup"
+        rollup_config_path.mkdir(exist_ok=True)
         
         print(f"Created local config structure at: {self.local_config_path}")
         print("You can now copy and customize mapping files from defaults directory")
@@ -126,6 +130,12 @@ def load_health_mapping(target_type: TargetType) -> Dict[str, Any]:
     return loader.load_mapping(target_type, DataType.HEALTH)
 
 
+def load_rollup_mapping(target_type: TargetType) -> Dict[str, Any]:
+    """Load mapping for weekly / monthly rollups to a specific target"""
+    loader = MappingLoader()
+    return loader.load_mapping(target_type, DataType.ROLLUP)
+
+
 def get_mapping_info() -> Dict[str, Dict[str, list]]:
     """Get information about all available mappings"""
     loader = MappingLoader()
@@ -0,0 +1,109 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+from health_tracker.utils.config_loader import config_get_float, config_get_int
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+class _ProducerError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class BatchPipeline:
+    """Overlaps a producer (fetching) with a consumer (writing).
+
+    The producer runs in a background thread and feeds a bounded queue, so it
+    blocks once ``queue_size`` items are waiting (backpressure). The calling
+    thread drains the queue in micro-batches that are flushed when they reach
+    ``batch_size`` items or when the oldest item has waited ``flush_interval``
+    seconds. End-to-end time approaches that of the slower stage.
+    """
+
+    def __init__(self, queue_size: Optional[int] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None):
+        self.queue_size = queue_size or config_get_int('sync.queue_size', 64)
+        self.batch_size = batch_size or config_get_int('sync.batch_size', 25)
+        self.flush_interval = flush_interval or config_get_float('sync.flush_interval_seconds', 5.0)
+
+    def run(self, items: Iterable[T], consume: Callable[[List[T]], None]) -> None:
+        buffer: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+
+        producer = threading.Thread(target=self._produce, args=(items, buffer, stopped), daemon=True)
+        producer.start()
+        try:
+            self._consume(buffer, consume)
+        finally:
+            stopped.set()
+            producer.join()
+
+    def _produce(self, items: Iterable[T], buffer: "queue.Queue", stopped: threading.Event) -> None:
+        try:
+            for item in items:
+                if not self._put(buffer, item, stopped):
+                    return
+        except BaseException as e:
+            self._put(buffer, _ProducerError(e), stopped)
+            return
+        self._put(buffer, _DONE, stopped)
+
+    def _put(self, buffer: "queue.Queue", item, stopped: threading.Event) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _consume(self, buffer: "queue.Queue", consume: Callable[[List[T]], None]) -> None:
+        batch: List[T] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = buffer.get(timeout=timeout)
+            except queue.Empty:
+                consume(batch)
+                batch = []
+                continue
+
+            if item is _DONE or isinstance(item, _ProducerError):
+                if batch:
+                    consume(batch)
+                if isinstance(item, _ProducerError):
+                    raise item.error
+                return
+
+            if not batch:
+                deadline = time.monotonic() + self.flush_interval
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                consume(batch)
+                batch = []
+
+
+def bounded_map(fn: Callable[[T], R], items: Iterable[T], workers: int) -> Iterator[R]:
+    """Ordered ``map`` over a thread pool that keeps at most ``workers`` calls in flight"""
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for item in items:
+            in_flight.append(executor.submit(fn, item))
+            if len(in_flight) >= workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
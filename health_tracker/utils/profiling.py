@@ -0,0 +1,146 @@
+import atexit
+import cProfile
+import io
+import multiprocessing
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import List, Optional
+
+DEFAULT_PROFILE_PATH = "health-tracker.prof"
+SAMPLE_INTERVAL_SECONDS = 0.005
+TOP_N = 25
+
+AUTH_FUNCTIONS = {"login", "_setup_auth", "_authorize", "_setup_client", "service_account", "_refresh_session"}
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+PHASES = ["import", "auth", "map", "fetch", "write", "other"]
+
+
+class Profiler:
+    """cProfile of the main thread plus a stack sampler over all threads.
+
+    The sampler feeds the collapsed-stack file (``<path>.collapsed``, readable by
+    flamegraph.pl / speedscope) and the wall-time split by phase; cProfile
+    feeds the pstats dump and the cumulative hot spot list.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.started = time.perf_counter()
+        self.stacks: Counter = Counter()
+        self.phases: Counter = Counter()
+        self._profile = cProfile.Profile()
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._profile.enable()
+        self._sampler.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        if self._stopped.is_set():
+            return
+        self._profile.disable()
+        self._stopped.set()
+        self._sampler.join()
+        elapsed = time.perf_counter() - self.started
+
+        self._profile.dump_stats(str(self.path))
+        collapsed_path = self.path.with_suffix(".collapsed")
+        with open(collapsed_path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        print(f"\nProfile: {self.path} (pstats), {collapsed_path} (collapsed stacks)", file=sys.stderr)
+        print(f"Wall time {elapsed:.2f}s; sampled time by phase, all threads:", file=sys.stderr)
+        for phase in PHASES:
+            print(f"  {phase:<8}{self.phases[phase] * SAMPLE_INTERVAL_SECONDS:>9.2f}s", file=sys.stderr)
+
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(TOP_N)
+        print(f"Top {TOP_N} cumulative (main thread):", file=sys.stderr)
+        print(out.getvalue().split("\n", 1)[-1].strip("\n"), file=sys.stderr)
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(SAMPLE_INTERVAL_SECONDS):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = _stack(frame)
+                phase = _phase(frames)
+                if phase is None:
+                    continue
+                self.phases[phase] += 1
+                self.stacks[";".join(_label(f) for f in reversed(frames))] += 1
+
+
+def _stack(frame: Optional[FrameType]) -> List[FrameType]:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return frames
+
+
+def _phase(frames: List[FrameType]) -> Optional[str]:
+    """Phase of a sampled stack (innermost frame first); None for idle threads"""
+    files = [f.f_code.co_filename.replace(os.sep, "/") for f in frames]
+    if any("importlib._bootstrap" in name for name in files):
+        return "import"
+    if any(f.f_code.co_name in AUTH_FUNCTIONS for f in frames):
+        return "auth"
+    if any("/destination/mapper/" in name or "/health_tracker/sheet/" in name for name in files):
+        return "map"
+    if any("/health_tracker/provider/" in name for name in files):
+        return "fetch"
+    if any("/health_tracker/destination/" in name for name in files):
+        return "write"
+    if files[0].endswith(IDLE_FILES):
+        return None
+    return "other"
+
+
+def _label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", Path(frame.f_code.co_filename).stem)
+    return f"{module}:{frame.f_code.co_name}"
+
+
+_profiler: Optional[Profiler] = None
+
+
+def start_profiling(path: Optional[str] = None) -> Profiler:
+    """Start the global profiler once; later calls return the running one"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(path or DEFAULT_PROFILE_PATH)
+        _profiler.start()
+    return _profiler
+
+
+def start_from_argv(argv: List[str] = sys.argv) -> None:
+    """Start profiling before the CLI imports anything else if ``--profile`` was passed.
+
+    A bare ``--profile`` is rewritten to ``--profile=<default>`` so click does
+    not take the following sub-command for the path. Spawned worker processes
+    (run-all) re-import the CLI with the parent's argv and are never profiled.
+    """
+    if multiprocessing.parent_process() is not None:
+        return
+    for i, arg in enumerate(argv[1:], start=1):
+        # Group options come before the sub-command
+        if arg == "--" or not arg.startswith("-"):
+            return
+        if arg == "--profile":
+            argv[i] = f"--profile={DEFAULT_PROFILE_PATH}"
+            start_profiling(DEFAULT_PROFILE_PATH)
+            return
+        if arg.startswith("--profile="):
+            start_profiling(arg.split("=", 1)[1] or DEFAULT_PROFILE_PATH)
+            return
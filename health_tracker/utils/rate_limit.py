@@ -0,0 +1,227 @@
+import logging
+import multiprocessing
+import random
+import threading
+import time
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from health_tracker.utils.config_loader import config_get, config_get_float, config_get_int
+
+# Published / observed quotas; override under rate_limits.<service> in config.yaml
+DEFAULT_LIMITS = {
+    "garmin": [{"requests": 3, "per_seconds": 1}],
+    "strava": [{"requests": 100, "per_seconds": 900}, {"requests": 1000, "per_seconds": 86400}],
+    "sheets": [{"requests": 60, "per_seconds": 60}],
+    "notion": [{"requests": 3, "per_seconds": 1}],
+}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = {"ConnectionError", "Timeout", "TimeoutError", "TimeoutException", "TransportError"}
+
+
+class TokenBucket:
+    """Thread-safe token bucket that blocks callers until a token is available"""
+
+    def __init__(self, requests: float, per_seconds: float):
+        self.capacity = float(requests)
+        self.rate = self.capacity / float(per_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._refill()
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def set_remaining(self, remaining: float, resets_in: float) -> None:
+        """Align the bucket with a budget reported by the server"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, max(remaining, 0))
+            if remaining <= 0:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + resets_in)
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+
+class _SharedField:
+    """Float attribute stored in a shared-memory array slot"""
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def __get__(self, bucket, owner=None):
+        return bucket._state[self.index]
+
+    def __set__(self, bucket, value: float) -> None:
+        bucket._state[self.index] = value
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket kept in shared memory so worker processes draw from one quota.
+
+    Must reach the workers at process start (pool initializer arguments).
+    """
+
+    tokens = _SharedField(0)
+    updated = _SharedField(1)
+    blocked_until = _SharedField(2)
+
+    def __init__(self, requests: float, per_seconds: float, context=None):
+        context = context or multiprocessing.get_context()
+        self._state = context.RawArray("d", 3)
+        super().__init__(requests, per_seconds)
+        self._lock = context.Lock()
+
+
+class RateLimiter:
+    """Per-service token buckets plus retry with exponential backoff and jitter.
+
+    Every provider and destination call goes through ``call`` (via ``api_call``),
+    so each service is throttled to its quota and 429/5xx/connection errors are
+    retried, honouring Retry-After when the server sends one.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("health-tracker")
+        self.max_attempts = config_get_int('rate_limits.max_attempts', 5)
+        self.backoff_base = config_get_float('rate_limits.backoff_base_seconds', 1.0)
+        self.backoff_max = config_get_float('rate_limits.backoff_max_seconds', 60.0)
+        self._buckets: Dict[str, List[TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def buckets(self, service: str) -> List[TokenBucket]:
+        with self._lock:
+            if service not in self._buckets:
+                self._buckets[service] = [TokenBucket(l["requests"], l["per_seconds"]) for l in service_limits(service)]
+            return self._buckets[service]
+
+    def set_limits(self, service: str, limits: List[dict]) -> None:
+        """Replace the buckets of a service; an empty list disables throttling"""
+        with self._lock:
+            self._buckets[service] = [TokenBucket(l["requests"], l["per_seconds"]) for l in limits]
+
+    def use_buckets(self, service: str, buckets: List[TokenBucket]) -> None:
+        """Throttle a service with buckets shared with other limiters or processes"""
+        with self._lock:
+            self._buckets[service] = buckets
+
+    def call(self, service: str, fn: Callable[[], Any], idempotent: bool = True) -> Any:
+        """Run ``fn`` within the service's quota, retrying failures that are safe to retry.
+
+        A call that is not ``idempotent`` (e.g. creating a page) is only retried
+        on 429, where the server rejected it unprocessed; a 5xx or a dropped
+        connection may have happened after the write landed.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            for bucket in self.buckets(service):
+                bucket.acquire()
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, idempotent)
+                if delay is None or attempt == self.max_attempts:
+                    raise
+                self.logger.warning(f"{service} call failed ({e}), retrying in {delay:.1f}s "
+                                    f"(attempt {attempt}/{self.max_attempts})")
+                if http_status(e) == 429:
+                    for bucket in self.buckets(service):
+                        bucket.block_for(delay)
+                time.sleep(delay)
+
+    def update_strava_usage(self, headers: Mapping[str, str], method: str = "GET") -> None:
+        """stravalib ``rate_limiter`` hook: sync the Strava buckets with its usage headers"""
+        headers = {k.lower(): v for k, v in headers.items()}
+        prefix = "x-readratelimit" if method == "GET" and "x-readratelimit-usage" in headers else "x-ratelimit"
+        if f"{prefix}-usage" not in headers or f"{prefix}-limit" not in headers:
+            return
+
+        usage = [int(v) for v in headers[f"{prefix}-usage"].split(",")]
+        limits = [int(v) for v in headers[f"{prefix}-limit"].split(",")]
+        now = datetime.now(timezone.utc)
+        next_quarter = (now + timedelta(minutes=15 - now.minute % 15)).replace(second=0, microsecond=0)
+        next_day = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        resets = [(next_quarter - now).total_seconds(), (next_day - now).total_seconds()]
+
+        for bucket, used, limit, resets_in in zip(self.buckets("strava"), usage, limits, resets):
+            bucket.set_remaining(limit - used, resets_in)
+
+    def _retry_delay(self, exc: Exception, attempt: int, idempotent: bool = True) -> Optional[float]:
+        status = http_status(exc)
+        if not idempotent and status != 429:
+            return None
+        if status not in RETRYABLE_STATUSES and not _is_transient(exc):
+            return None
+
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            return retry_after + random.uniform(0, 1)
+
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+def service_limits(service: str) -> List[dict]:
+    """Configured token bucket limits of a service"""
+    return config_get(f'rate_limits.{service}', DEFAULT_LIMITS.get(service, []))
+
+
+def http_status(exc: Exception) -> Optional[int]:
+    """Best effort HTTP status of a client exception"""
+    if "TooManyRequests" in type(exc).__name__ or "RateLimitExceeded" in type(exc).__name__:
+        return 429
+    for candidate in (exc, getattr(exc, "error", None)):
+        if candidate is None:
+            continue
+        status = getattr(candidate, "status", None)
+        if isinstance(status, int):
+            return status
+        status_code = getattr(getattr(candidate, "response", None), "status_code", None)
+        if isinstance(status_code, int):
+            return status_code
+    return None
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    timeout = getattr(exc, "timeout", None)  # stravalib RateLimitExceeded
+    if isinstance(timeout, (int, float)):
+        return float(timeout)
+
+    for candidate in (exc, getattr(exc, "error", None)):
+        headers = getattr(candidate, "headers", None) or getattr(getattr(candidate, "response", None), "headers", None)
+        value = (headers.get("Retry-After") or headers.get("retry-after")) if headers else None
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _is_transient(exc: Exception) -> bool:
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Get global rate limiter instance"""
+    return RateLimiter()
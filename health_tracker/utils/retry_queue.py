@@ -0,0 +1,69 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from health_tracker.utils.config_loader import config_get_float, config_get_int, config_get_path
+from health_tracker.utils.state_file import load_json, update_json
+
+
+class RetryQueue:
+    """Persistent dead-letter queue of failed sync units (a date, an activity ID or a range).
+
+    Units are kept per ``<kind>:<source>:<target>`` together with the payload that
+    was already fetched, if any, so a failed write is retried without fetching
+    again. Retries back off exponentially; after ``sync.retry.max_attempts`` a
+    unit is marked dead and left in the file for inspection.
+    """
+
+    def __init__(self, kind: str, source_label: str, target_label: str, queue_file: Optional[Path] = None):
+        self.key = f"{kind}:{source_label}:{target_label}"
+        self.queue_file = queue_file or config_get_path('sync.retry.file', 'retry_queue.json')
+        self.max_attempts = config_get_int('sync.retry.max_attempts', 5)
+        self.backoff_base = config_get_float('sync.retry.backoff_base_seconds', 900.0)
+        self.backoff_max = config_get_float('sync.retry.backoff_max_seconds', 86400.0)
+        self._units: Dict[str, dict] = load_json(self.queue_file).get(self.key, {})
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def due(self) -> List[Tuple[str, Optional[dict]]]:
+        """(unit, payload) of every live unit whose backoff has expired"""
+        now = time.time()
+        with self._lock:
+            return [
+                (unit, entry.get("payload")) for unit, entry in sorted(self._units.items())
+                if not entry.get("dead") and entry.get("next_attempt", 0) <= now
+            ]
+
+    def fail(self, unit: str, error: Exception, payload: Optional[dict] = None) -> bool:
+        """Queue or requeue a unit; False once it has used up its attempts"""
+        with self._lock:
+            entry = self._units.setdefault(unit, {"attempts": 0})
+            entry["attempts"] += 1
+            entry["error"] = str(error)
+            if payload is not None:
+                entry["payload"] = payload
+            backoff = min(self.backoff_max, self.backoff_base * 2 ** (entry["attempts"] - 1))
+            entry["next_attempt"] = time.time() + backoff
+            entry["dead"] = entry["attempts"] >= self.max_attempts
+            self._changed = True
+            return not entry["dead"]
+
+    def done(self, unit: str) -> None:
+        with self._lock:
+            if self._units.pop(unit, None) is not None:
+                self._changed = True
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._units.values() if not entry.get("dead"))
+
+    def save(self) -> None:
+        """Write this queue's section, keeping whatever other queues saved to the file meanwhile"""
+        with self._lock:
+            if not self._changed:
+                return
+            units = json.loads(json.dumps(self._units))
+            self._changed = False
+        update_json(self.queue_file, lambda data: data.update({self.key: units}), indent=2, sort_keys=True)
@@ -0,0 +1,98 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from health_tracker.utils.config_loader import config_get_float, config_get_path
+
+POLL_SECONDS = 1.0
+
+
+class RunLock:
+    """Advisory cross-process lock, one per ``<kind>-<source>-<target>``.
+
+    ``<name>.lock`` is held with flock for the length of a run; ``<name>.json``
+    describes the holder while it runs and the last finished run afterwards.
+    A run that had to wait reads ``covered``: the range of the run it waited
+    for, if that run finished cleanly, so it only syncs the rest.
+    """
+
+    def __init__(self, kind: str, source_label: str, target_label: str, lock_dir: Optional[Path] = None):
+        lock_dir = lock_dir or config_get_path('sync.lock.dir', 'locks')
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{kind}-{source_label}-{target_label}"
+        self.lock_file = lock_dir / f"{name}.lock"
+        self.state_file = lock_dir / f"{name}.json"
+        self.timeout = config_get_float('sync.lock.timeout_seconds')
+        self.covered: Optional[Tuple[str, str]] = None
+        self._range: Tuple[str, str] = ("", "")
+        self._handle = None
+
+    def acquire(self, start: str, end: str, wait: bool = True,
+                on_wait: Optional[Callable[[str], None]] = None) -> bool:
+        """Take the lock for syncing ``start``..``end``; False when it is busy and ``wait`` is off or timed out"""
+        handle = open(self.lock_file, "a+")
+        waited_since = time.time()
+        waited = False
+        while not self._try_lock(handle):
+            if not wait or (self.timeout is not None and time.time() - waited_since >= self.timeout):
+                handle.close()
+                return False
+            if not waited and on_wait:
+                on_wait(self.describe_holder())
+            waited = True
+            time.sleep(POLL_SECONDS)
+
+        self._handle = handle
+        self._range = (str(start), str(end))
+        previous = self.holder()
+        if waited and previous.get("ok") and previous.get("finished_at", 0) >= waited_since:
+            self.covered = tuple(previous["range"])
+        self._write({"pid": os.getpid(), "range": self._range, "started_at": time.time()})
+        return True
+
+    def release(self, ok: bool) -> None:
+        if self._handle is None:
+            return
+        self._write({"pid": os.getpid(), "range": self._range, "finished_at": time.time(), "ok": ok})
+        self._handle.close()  # closing drops the lock
+        self._handle = None
+
+    def holder(self) -> dict:
+        """The running or last finished run, as written to the state file"""
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def describe_holder(self) -> str:
+        holder = self.holder()
+        if "pid" not in holder or "finished_at" in holder:
+            return "already running"
+        return f"already running (pid {holder['pid']}, {holder['range'][0]} → {holder['range'][1]})"
+
+    def _write(self, state: dict) -> None:
+        tmp_file = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+
+    @staticmethod
+    def _try_lock(handle) -> bool:
+        try:
+            if fcntl:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
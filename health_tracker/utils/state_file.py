@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def load_json(path: Path) -> dict:
+    """Contents of a JSON state file, empty when it is missing or unreadable"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_json(path: Path, data: Any, **dump_kwargs) -> None:
+    """Atomically replace ``path``, through a temp file of its own so concurrent writers never share one"""
+    path = Path(path)
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, prefix=path.name + ".", suffix=".tmp",
+                                     delete=False) as f:
+        tmp_path = f.name
+        try:
+            json.dump(data, f, **dump_kwargs)
+        except BaseException:
+            f.close()
+            os.unlink(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on ``<path>.lock``, across threads and processes"""
+    path = Path(path)
+    with open(path.with_name(path.name + ".lock"), "a+") as handle:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                handle.seek(0)
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10 seconds
+                    continue
+        yield  # closing the handle drops the lock
+
+
+def update_json(path: Path, update: Callable[[dict], None], **dump_kwargs) -> dict:
+    """Read-modify-write a JSON state file under its lock; ``update`` changes the data in place.
+
+    State files are shared by concurrent runs (sync-health and sync-activities,
+    or runs for different targets), so each saver merges its own sections into
+    what is on disk instead of writing back the copy it loaded at start.
+    """
+    with locked(path):
+        data = load_json(path)
+        update(data)
+        write_json(path, data, **dump_kwargs)
+    return data
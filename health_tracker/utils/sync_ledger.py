@@ -0,0 +1,48 @@
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from health_tracker.data.day_health_data import DayHealthData
+from health_tracker.utils.config_loader import config_get_int, config_get_path
+from health_tracker.utils.state_file import load_json, update_json
+
+# Field whose presence marks a day as complete, when the target maps it
+SETTLED_FIELD = "sleep_hours"
+
+
+class SyncLedger:
+    """Remembers when each day was synced from a source to a target and whether it is settled.
+
+    A day is settled once it was synced at least ``sync.settle_after_days`` days
+    after the fact with ``settled_field`` (sleep data by default) present; Garmin
+    no longer changes such days, so ranged syncs skip them unless forced.
+    Without a ``settled_field`` no day is ever settled.
+    """
+
+    def __init__(self, source_label: str, target_label: str, ledger_file: Optional[Path] = None,
+                 settled_field: Optional[str] = SETTLED_FIELD):
+        self.key = f"{source_label}:{target_label}"
+        self.settled_field = settled_field
+        self.ledger_file = ledger_file or config_get_path('sync.ledger_file', 'sync_ledger.json')
+        self.settle_after_days = config_get_int('sync.settle_after_days', 3)
+        self._days: Dict[str, dict] = load_json(self.ledger_file).get(self.key, {})
+        self._changed = False
+
+    def is_settled(self, day: str) -> bool:
+        return bool(self._days.get(day, {}).get("settled"))
+
+    def record(self, day: str, data: DayHealthData) -> None:
+        settled = (
+            self.settled_field is not None
+            and date.fromisoformat(day) <= date.today() - timedelta(days=self.settle_after_days)
+            and getattr(data, self.settled_field) is not None
+        )
+        self._days[day] = {"synced_at": datetime.now().isoformat(timespec="seconds"), "settled": settled}
+        self._changed = True
+
+    def save(self) -> None:
+        """Write this source/target section, keeping the sections other runs saved meanwhile"""
+        if not self._changed:
+            return
+        update_json(self.ledger_file, lambda data: data.update({self.key: self._days}), indent=2, sort_keys=True)
+        self._changed = False
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from health_tracker.utils.config_loader import config_get_float, config_get_int
+
+
+@dataclass(frozen=True)
+class TransportSettings:
+    pool_size: int
+    connect_timeout: float
+    read_timeout: float
+    keepalive_seconds: float
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests sent without one"""
+
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def transport_settings() -> TransportSettings:
+    """Connection settings shared by every provider and destination client.
+
+    Unless ``http.pool_size`` is set, the pool holds one connection per
+    concurrent fetch plus the writer, and never less than requests' default of 10.
+    """
+    concurrency = config_get_int('sync.fetch_workers', 1) + 1
+    return TransportSettings(
+        pool_size=config_get_int('http.pool_size') or max(10, concurrency),
+        connect_timeout=config_get_float('http.connect_timeout_seconds', 10.0),
+        read_timeout=config_get_float('http.read_timeout_seconds', 60.0),
+        keepalive_seconds=config_get_float('http.keepalive_seconds', 60.0),
+    )
+
+
+def configure_session(session: requests.Session) -> requests.Session:
+    """Mount a pooled, keep-alive adapter with default timeouts on a requests session"""
+    settings = transport_settings()
+    adapter = TimeoutHTTPAdapter(
+        timeout=(settings.connect_timeout, settings.read_timeout),
+        pool_connections=settings.pool_size,
+        pool_maxsize=settings.pool_size,
+        # Retries are handled by the rate limiter
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+def new_session() -> requests.Session:
+    return configure_session(requests.Session())
+
+
+def httpx_client() -> httpx.Client:
+    settings = transport_settings()
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.pool_size,
+            max_keepalive_connections=settings.pool_size,
+            keepalive_expiry=settings.keepalive_seconds,
+        ),
+        timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+    )
+
+
+def configure_garmin(garmin) -> None:
+    """Apply the shared settings to a garminconnect client.
+
+    Older garminconnect releases talk through a garth client, newer ones keep a
+    plain requests session on ``client.cs``.
+    """
+    settings = transport_settings()
+    garth_client = getattr(garmin, "garth", None)
+    if garth_client is not None and hasattr(garth_client, "configure"):
+        garth_client.configure(
+            timeout=settings.read_timeout,
+            pool_connections=settings.pool_size,
+            pool_maxsize=settings.pool_size,
+        )
+        return
+
+    session = getattr(getattr(garmin, "client", None), "cs", None)
+    if isinstance(session, requests.Session):
+        configure_session(session)